@@ -0,0 +1,56 @@
+"""Micro-benchmark for writing many small files with LocalFileSystem.open.
+
+Compares `LocalFileSystem.open`, which remembers the directories it created,
+with calling os.makedirs before every open, which is what it used to do.
+
+Usage::
+
+    python benchmarks/local_small_writes.py [n_files] [n_dirs]
+
+Set TMPDIR to a tmpfs (e.g. /dev/shm) to keep disk latency out of the numbers.
+"""
+import builtins
+import os
+import sys
+import tempfile
+import time
+
+from drfs.filesystems.local import LocalFileSystem
+
+
+def _open_makedirs(path, mode):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return builtins.open(path, mode)
+
+
+def _write_all(open_, paths):
+    start = time.perf_counter()
+    for path in paths:
+        with open_(path, "wb") as f:
+            f.write(b"x")
+    return time.perf_counter() - start
+
+
+def main(n=50000, n_dirs=200, repeat=3):
+    fs = LocalFileSystem()
+    cases = [("makedirs", _open_makedirs), ("drfs", fs.open)]
+    best = {}
+    # alternate the cases, so both see the same disk state
+    for _ in range(repeat):
+        for label, open_ in cases:
+            root = tempfile.mkdtemp()
+            try:
+                paths = [
+                    os.path.join(root, f"part={i % n_dirs}", f"{i}.bin")
+                    for i in range(n)
+                ]
+                elapsed = _write_all(open_, paths)
+            finally:
+                fs.remove(root, recursive=True)
+            best[label] = min(elapsed, best.get(label, elapsed))
+    for label, elapsed in best.items():
+        print(f"{label:>8}: {n / elapsed:>10,.0f} files/s")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
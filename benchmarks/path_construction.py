@@ -0,0 +1,36 @@
+"""Micro-benchmark for DRPath construction throughput.
+
+Compares the memoized scheme dispatch of `DRPath` with a dispatch through a full
+`get_fs` lookup for every path, which is what DRPath used to do.
+
+Usage::
+
+    python benchmarks/path_construction.py [n_paths]
+"""
+import sys
+import timeit
+
+from drfs.filesystems import get_fs
+from drfs.path import DRPath, LocalPath, RemotePath
+
+
+def _dispatch_get_fs(path):
+    cls = RemotePath if get_fs(path, rtype="class").is_remote else LocalPath
+    return cls(path)
+
+
+def main(n=20000, repeat=5):
+    cases = {
+        "local": [f"/data/partition={i}/part.parquet" for i in range(n)],
+        "remote": [f"s3://bucket/partition={i}/part.parquet" for i in range(n)],
+    }
+    for name, paths in cases.items():
+        for label, func in [("get_fs", _dispatch_get_fs), ("DRPath", DRPath)]:
+            best = min(
+                timeit.repeat(lambda: [func(p) for p in paths], number=1, repeat=repeat)
+            )
+            print(f"{name:>6} {label:>6}: {n / best:>10,.0f} paths/s")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -15,3 +15,4 @@ del get_versions
 
 from .path import DRPath
 from .structure import Tree, P
+from .transfers import TransferReport, transfer
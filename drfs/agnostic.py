@@ -1,6 +1,7 @@
 import os
 
 from drfs.filesystems import get_fs
+from drfs.filesystems.aio import get_async_fs
 
 
 def glob(path, opts=None):
@@ -33,6 +34,41 @@ def rmdir(path, opts=None):
     return get_fs(path, opts=opts).rmdir(path)
 
 
+async def aglob(path, opts=None):
+    """Filesystem-agnostic async glob."""
+    return await (await get_async_fs(path, opts=opts)).glob(path)
+
+
+async def aexists(path, opts=None):
+    """Filesystem-agnostic async exists."""
+    return await (await get_async_fs(path, opts=opts)).exists(path)
+
+
+async def aopen(path, mode, opts=None):
+    """Filesystem-agnostic async open."""
+    return await (await get_async_fs(path, opts=opts)).open(path, mode)
+
+
+async def acat(path, opts=None):
+    """Filesystem-agnostic async cat."""
+    return await (await get_async_fs(path, opts=opts)).cat(path)
+
+
+async def amv(src, dst, opts=None):
+    """Filesystem-agnostic async mv."""
+    return await (await get_async_fs(src, opts=opts)).mv(src, dst)
+
+
+async def amakedirs(path, *args, opts=None, **kwargs):
+    """Filesystem-agnostic async makedirs."""
+    return await (await get_async_fs(path, opts=opts)).makedirs(path, *args, **kwargs)
+
+
+async def armdir(path, opts=None):
+    """Filesystem-agnostic async rmdir."""
+    return await (await get_async_fs(path, opts=opts)).rmdir(path)
+
+
 def savefig(path, *args, opts=None, **kwargs):
     """Filesystem-agnostic savefig."""
     import matplotlib.pyplot as plt
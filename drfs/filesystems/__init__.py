@@ -1,8 +1,9 @@
 # Filesystem imports:
 import drfs.filesystems.local
 import drfs.filesystems.memory
-from drfs.filesystems.base import FILESYSTEMS
-from drfs.filesystems.util import get_fs
+from drfs.filesystems.base import FILESYSTEMS, BatchError
+from drfs.filesystems.util import clear_fs_cache, get_fs
+from drfs.filesystems.aio import AsyncFileSystemBase, get_async_fs
 
 try:
     import drfs.filesystems.gcs
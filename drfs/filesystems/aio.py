@@ -0,0 +1,202 @@
+"""Asyncio interface for drfs filesystems.
+
+`AsyncFileSystemBase` wraps a (synchronous) drfs filesystem. If its backend is
+an async fsspec implementation (e.g. s3fs or gcsfs), the native coroutines are
+awaited directly. Everything else runs on a thread pool shared by all
+instances, so the event loop is never blocked.
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from drfs.filesystems.base import FileSystemBase
+from drfs.filesystems.util import get_fs, io_profile_options
+from drfs.util import prepend_scheme, prepend_schemes, remove_scheme
+
+_EXECUTOR = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def _get_executor():
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(thread_name_prefix="drfs-aio")
+        return _EXECUTOR
+
+
+def _reset_executor_after_fork():
+    global _EXECUTOR, _EXECUTOR_LOCK
+    _EXECUTOR = None
+    _EXECUTOR_LOCK = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_executor_after_fork)
+
+
+async def run_in_executor(func, *args, executor=None, **kwargs):
+    """Run func on the drfs thread pool (or executor) and await the result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        executor or _get_executor(), partial(func, *args, **kwargs)
+    )
+
+
+class AsyncFileSystemBase:
+    """Asyncio facade for a drfs filesystem.
+
+    Parameters
+    ----------
+    fs: FileSystemBase
+        the wrapped filesystem.
+    executor: concurrent.futures.Executor
+        used for operations without a native coroutine, defaults to a thread
+        pool shared by all instances.
+    """
+
+    def __init__(self, fs, executor=None):
+        self.sync_fs = fs
+        self.executor = executor
+
+    @property
+    def scheme(self):
+        return self.sync_fs.scheme
+
+    @property
+    def is_remote(self):
+        return self.sync_fs.is_remote
+
+    def _has_native(self, name, native_name, path=None):
+        """True if `native_name` coroutine can replace the sync method `name`.
+
+        It can't if the drfs filesystem changes the method's behaviour, by
+        overriding it or with features which are turned on, see `_bypasses`.
+        """
+        backend = getattr(self.sync_fs, "fs", None)
+        return (
+            getattr(backend, "async_impl", False)
+            and hasattr(backend, native_name)
+            and getattr(type(self.sync_fs), name, None)
+            is getattr(FileSystemBase, name, None)
+            and not self._bypasses(name, path)
+        )
+
+    def _bypasses(self, name, path):
+        """True if the native coroutine would skip drfs features used by name."""
+        from drfs.path import asstr
+
+        fs = self.sync_fs
+        if name == "ls":
+            return fs.listings is not None
+        if name in ("info", "exists"):
+            return fs.infos is not None
+        if name == "cat":
+            if fs.disk_cache is not None:
+                return True
+            profile = io_profile_options(
+                prepend_scheme(fs.scheme, asstr(path)),
+                None,
+                fs.io_profile,
+            )
+            return bool(profile)
+        if name == "put":
+            # e.g. multipart uploads of S3
+            return type(fs)._put_file is not FileSystemBase._put_file
+        return False
+
+    async def _native(self, native_name, *args, **kwargs):
+        from drfs.path import asstr
+
+        backend = self.sync_fs.fs
+        args = [asstr(a) for a in args]
+        if not self.sync_fs.supports_scheme:
+            args = [remove_scheme(a, raise_=False) for a in args]
+        coro = getattr(backend, native_name)(*args, **kwargs)
+        if getattr(backend, "asynchronous", False):
+            # instance was created for the running loop
+            return await coro
+        future = asyncio.run_coroutine_threadsafe(coro, backend.loop)
+        return await asyncio.wrap_future(future)
+
+    async def _run(self, func, *args, **kwargs):
+        return await run_in_executor(func, *args, executor=self.executor, **kwargs)
+
+    def _as_paths(self, res, as_paths):
+        from drfs.path import aspath
+
+        res = prepend_schemes(self.scheme, res)
+        if as_paths is None:
+            as_paths = getattr(self.sync_fs, "as_paths", True)
+        return aspath(res) if as_paths else res
+
+    async def open(self, path, *args, **kwargs):
+        """Open a file, the returned file object itself is synchronous."""
+        return await self._run(self.sync_fs.open, path, *args, **kwargs)
+
+    async def exists(self, path):
+        if self._has_native("exists", "_exists", path):
+            return await self._native("_exists", path)
+        return await self._run(self.sync_fs.exists, path)
+
+    async def ls(self, path, as_paths=None):
+        if self._has_native("ls", "_ls", path):
+            res = await self._native("_ls", path, detail=False)
+            return self._as_paths(res, as_paths)
+        return await self._run(self.sync_fs.ls, path, as_paths=as_paths)
+
+    async def info(self, path):
+        if self._has_native("info", "_info", path):
+            return await self._native("_info", path)
+        return await self._run(self.sync_fs.info, path)
+
+    async def cat(self, path):
+        if self._has_native("cat", "_cat_file", path):
+            return await self._native("_cat_file", path)
+        return await self._run(self.sync_fs.cat, path)
+
+    async def put(self, filename, path, **kwargs):
+        if (
+            self._has_native("put", "_put_file", path)
+            and not kwargs
+            and not os.path.isdir(filename)
+        ):
+            try:
+                return await self._native("_put_file", filename, path)
+            finally:
+                self.sync_fs.invalidate_caches(path)
+        return await self._run(self.sync_fs.put, filename, path, **kwargs)
+
+    async def glob(self, path, **kwargs):
+        return await self._run(self.sync_fs.glob, path, **kwargs)
+
+    async def walk(self, path, **kwargs):
+        return await self._run(self.sync_fs.walk, path, **kwargs)
+
+    async def remove(self, path, *args, **kwargs):
+        return await self._run(self.sync_fs.remove, path, *args, **kwargs)
+
+    rm = remove
+
+    async def move(self, path, *args, **kwargs):
+        return await self._run(self.sync_fs.move, path, *args, **kwargs)
+
+    mv = move
+
+    async def makedirs(self, path, *args, **kwargs):
+        return await self._run(self.sync_fs.makedirs, path, *args, **kwargs)
+
+    async def rmdir(self, path, *args, **kwargs):
+        return await self._run(self.sync_fs.rmdir, path, *args, **kwargs)
+
+
+async def get_async_fs(path, opts=None):
+    """Async version of `get_fs`, returns an AsyncFileSystemBase.
+
+    Creating a filesystem may connect to the remote service, so it's done on
+    the thread pool.
+    """
+    fs = await run_in_executor(get_fs, path, opts=opts)
+    return AsyncFileSystemBase(fs)
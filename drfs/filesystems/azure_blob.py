@@ -1,9 +1,22 @@
 import os
+import re
+import time
+from collections import namedtuple
+from functools import lru_cache
 
 import azureblobfs.dask as abfs
 
 from drfs.filesystems.base import FILESYSTEMS, FileSystemBase
-from drfs.filesystems.util import allow_pathlib, return_pathlib, return_schemes
+from drfs.filesystems.cache import cached_listing, invalidates_caches
+from drfs.filesystems.util import (
+    allow_pathlib,
+    atomic_local_file,
+    is_transient,
+    retry,
+    return_pathlib,
+    return_schemes,
+    transfer_options,
+)
 
 
 class AzureBlobFileSystem(FileSystemBase):
@@ -13,25 +26,116 @@ class AzureBlobFileSystem(FileSystemBase):
 
     @allow_pathlib
     def exists(self, path, *args, **kwargs):
-        return self.fs.exists(*extract_abfs_parts(path)[1:], *args, **kwargs)
+        parts = extract_abfs_parts(path)
+        return self.fs.exists(parts.container, parts.key, *args, **kwargs)
 
     @return_pathlib
+    @cached_listing
     @return_schemes
     @allow_pathlib
     def ls(self, path, *args, **kwargs):
         acc, cont, rest = extract_abfs_parts(path)
         res = self.fs.ls(cont, os.path.join(rest, "*"), *args, **kwargs)
-        return [os.path.join(acc, cont, item) for item in res]
+        prefix = os.path.join(acc, cont, "")
+        return [prefix + item for item in res]
+
+    @invalidates_caches
+    @allow_pathlib
+    def remove(self, path, recursive=False):
+        """Remove a blob, or with recursive=True all blobs below path."""
+        if recursive:
+            return self.remove_many(self._list_files(path))
+        _, cont, key = extract_abfs_parts(path)
+        self.fs.connection.delete_blob(cont, key)
+
+    def _copy_file(self, src, dst):
+        """Copy a blob within the storage account with Copy Blob.
+
+        The service copies the data, this waits until it's done.
+        """
+        _, src_cont, src_key = extract_abfs_parts(src)
+        _, cont, key = extract_abfs_parts(dst)
+        conn = self.fs.connection
+        url = conn.make_blob_url(src_cont, src_key, sas_token=conn.sas_token)
+        retries = transfer_options().retries
+        copy = retry(lambda: conn.copy_blob(cont, key, url), retries, _retryable)
+        delay = 0.1
+        while copy.status == "pending":
+            time.sleep(delay)
+            delay = min(delay * 2, 5)
+            copy = conn.get_blob_properties(cont, key).properties.copy
+        if copy.status != "success":
+            raise IOError(
+                f"Copy of {src} to {dst} {copy.status}: {copy.status_description}"
+            )
+
+    def _move_file(self, src, dst):
+        self._copy_file(src, dst)
+        self.remove(src)
+
+    def _put_file(self, filename, path, opts, pool, **kwargs):
+        """Upload with the SDK, which sends blocks over max_workers connections.
+
+        kwargs are passed to `create_blob_from_path`, e.g. content_settings.
+        """
+        _, cont, key = extract_abfs_parts(path)
+        retry(
+            lambda: self.fs.connection.create_blob_from_path(
+                cont, key, filename, max_connections=opts.max_workers, **kwargs
+            ),
+            opts.retries,
+            _retryable,
+        )
+
+    def _get_file(self, path, filename, opts, pool):
+        """Download with the SDK, which fetches ranges over max_workers connections."""
+        _, cont, key = extract_abfs_parts(path)
+        with atomic_local_file(filename) as tmp:
+            retry(
+                lambda: self.fs.connection.get_blob_to_path(
+                    cont, key, tmp, max_connections=opts.max_workers
+                ),
+                opts.retries,
+                _retryable,
+            )
+
+    def _list_files(self, path):
+        acc, cont, key = extract_abfs_parts(path)
+        prefix = key.rstrip("/") + "/" if key else None
+        return [
+            f"abfs://{acc}/{cont}/{blob.name}"
+            for blob in self.fs.connection.list_blobs(cont, prefix=prefix)
+        ]
+
+
+def _retryable(e):
+    status = getattr(e, "status_code", None)
+    if status is not None:
+        return status >= 500 or status in (408, 429)
+    return is_transient(e)
+
+
+AbfsPath = namedtuple("AbfsPath", ["account", "container", "key"])
+
+_ABFS_PATTERN = re.compile("abfs://(.*?)/(.*?)/(.*)")
 
 
 def extract_abfs_parts(path):
-    import re
+    """Split an abfs path into an `AbfsPath(account, container, key)` tuple.
+
+    Results are cached, as the same path is usually parsed by get_fs and then
+    again by the filesystem method. Paths are cached as strings, so DRPaths
+    and strings share entries.
+    """
+    return _extract_abfs_parts(str(path))
+
 
-    match = re.match("abfs://(.*?)/(.*?)/(.*)", path)
+@lru_cache(maxsize=4096)
+def _extract_abfs_parts(path):
+    match = _ABFS_PATTERN.match(path)
     if match is None:
         raise ValueError(f"Path {path} doesn't match abfs path pattern.")
-    account, container, rest = match.groups()
-    return account, container, rest
+    return AbfsPath(*match.groups())
 
 
 FILESYSTEMS["abfs"] = AzureBlobFileSystem
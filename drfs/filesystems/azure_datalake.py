@@ -1,8 +1,74 @@
+import inspect
+import threading
+import time
+
 from azure.datalake.store import lib, AzureDLFileSystem
+from azure.datalake.store.multithread import ADLUploader
+
 from drfs.filesystems.base import FileSystemBase, FILESYSTEMS
 
+# Tokens are refreshed when they are valid for less than this many seconds.
+TOKEN_REFRESH_MARGIN = 300
+
+# Options handled by FileSystemBase, the others are passed to AzureDLFileSystem.
+_BASE_OPTIONS = {
+    name
+    for name, param in inspect.signature(FileSystemBase.__init__).parameters.items()
+    if param.kind is param.KEYWORD_ONLY
+}
+
+_TOKENS = {}
+_TOKENS_LOCK = threading.Lock()
+
+
+def get_token(tenant_id=None, client_id=None, client_secret=None):
+    """Get a cached token for the given credentials.
+
+    A new token is only requested when none is cached yet or the cached one
+    is about to expire.
+    """
+    key = (tenant_id, client_id, client_secret)
+    with _TOKENS_LOCK:
+        token = _TOKENS.get(key)
+        if token is None or _expires_soon(token):
+            token = _refresh(token) if token is not None else None
+            if token is None:
+                token = lib.auth(
+                    tenant_id=tenant_id,
+                    client_id=client_id,
+                    client_secret=client_secret,
+                )
+            _TOKENS[key] = token
+        return token
+
+
+def _expires_soon(token):
+    details = getattr(token, "token", None)
+    try:
+        expires_at = details["time"] + details["expires_in"]
+    except (TypeError, KeyError):
+        # we don't know when it expires, the library will refresh it if needed
+        return False
+    return expires_at - time.time() < TOKEN_REFRESH_MARGIN
+
+
+def _refresh(token):
+    try:
+        token.refresh_token()
+    except Exception:
+        return None
+    return token
+
 
 class AzureDataLakeFileSystem(FileSystemBase):
+    """Wrapper for AzureDLFileSystem supporting many stores.
+
+    Paths have the form `adl://STORE_NAME/folder/file.extension`. One connection
+    is kept per store and reused by all operations; tokens are shared between
+    instances with the same credentials. Instances are safe to use from many
+    threads.
+    """
+
     fs_cls = AzureDLFileSystem
     scheme = "adl"
     is_remote = True
@@ -12,15 +78,17 @@ class AzureDataLakeFileSystem(FileSystemBase):
         self.tenant_id = tenant_id
         self.client_id = client_id
         self.client_secret = client_secret
-        self.kwargs = kwargs
-        # self.kwargs['store_name'] = kwargs['host']
-        token = lib.auth(
-            tenant_id=self.tenant_id,
-            client_id=self.client_id,
-            client_secret=self.client_secret,
-        )
-        self.kwargs["token"] = token
-        self.fs = AzureDLFileSystem(**self.kwargs)
+        kwargs["token"] = self._token()
+        super().__init__(**kwargs)
+        # options for connections to further stores
+        self.kwargs = {k: v for k, v in kwargs.items() if k not in _BASE_OPTIONS}
+        self._stores = {}
+        self._lock = threading.Lock()
+        if "store_name" in kwargs:
+            self._stores[kwargs["store_name"]] = self.fs
+
+    def _token(self):
+        return get_token(self.tenant_id, self.client_id, self.client_secret)
 
     def _parse_store_name(self, path):
         from drfs.path import RemotePath
@@ -36,62 +104,107 @@ class AzureDataLakeFileSystem(FileSystemBase):
             )
         return store_name, path
 
-    def _connect(self, path):
-        self.fs.kwargs["store_name"], path = self._parse_store_name(path)
-        self.fs.connect()
-        return path
-
-    def _add_store_name(self, p):
-        from drfs.path import RemotePath
-
-        parts = p.parts
-        part0 = parts[0].split("/")[2]
-        drv = parts[0].replace(part0, self.fs.kwargs["store_name"])
-        return RemotePath(drv, part0, *parts[1:])
-
-    def ls(self, path, *args, **kwargs):
-        path = self._connect(path)
-        return [self._add_store_name(p) for p in super().ls(path, *args, **kwargs)]
+    def _get_store(self, store_name):
+        """Return the connection to store_name, connect on first use."""
+        with self._lock:
+            try:
+                return self._stores[store_name]
+            except KeyError:
+                kwargs = dict(self.kwargs, store_name=store_name, token=self._token())
+                fs = self._stores[store_name] = self.fs_cls(**kwargs)
+                return fs
 
-    def open(self, path, *args, **kwargs):
-        path = self._connect(path)
-        return super().open(path, *args, **kwargs)
+    def _connect(self, path):
+        """Return the connection to the store of path and the path inside it."""
+        store_name, path = self._parse_store_name(path)
+        return self._get_store(store_name), path
+
+    def _add_store_names(self, store_name, paths, as_paths=None):
+        from drfs.path import aspath
+
+        res = [f"{self.scheme}://{store_name}/{p.lstrip('/')}" for p in paths]
+        if as_paths is None:
+            as_paths = self.as_paths
+        return aspath(res) if as_paths else res
+
+    def ls(self, path, *args, as_paths=None, **kwargs):
+        store_name, path = self._parse_store_name(path)
+        res = self._get_store(store_name).ls(path, *args, **kwargs)
+        return self._add_store_names(store_name, res, as_paths)
+
+    def open(self, path, *args, atomic=False, **kwargs):
+        mode = args[0] if args else kwargs.get("mode", "rb")
+        if atomic and ("r" not in mode or "+" in mode):
+            kwargs.pop("mode", None)
+            return self._open_atomic(path, mode, *args[1:], **kwargs)
+        fs, path = self._connect(path)
+        return fs.open(path, *args, **kwargs)
+
+    def _put_file(self, filename, path, opts, pool, **kwargs):
+        """Upload in chunks which are concatenated once all are uploaded."""
+        fs, path = self._connect(path)
+        ADLUploader(
+            fs, path, filename, nthreads=opts.max_workers, overwrite=True, **kwargs
+        )
 
     def exists(self, path, *args, **kwargs):
-        path = self._connect(path)
-        return super().exists(path, *args, **kwargs)
+        fs, path = self._connect(path)
+        return fs.exists(path, *args, **kwargs)
 
     def remove(self, path, *args, **kwargs):
-        path = self._connect(path)
-        return super().remove(path, *args, **kwargs)
+        fs, path = self._connect(path)
+        return fs.rm(path, *args, **kwargs)
+
+    def move(self, path, dst, recursive=False, max_workers=None):
+        """Rename path, directories are renamed with all their contents."""
+        fs, path = self._connect(path)
+        dst_store, dst = self._parse_store_name(dst)
+        if self._get_store(dst_store) is not fs:
+            raise ValueError("Can't move files between different stores.")
+        return fs.mv(path, dst)
 
     def mv(self, path, *args, **kwargs):
-        path = self._connect(path)
-        return super().mv(path, *args, **kwargs)
+        return self.move(path, *args, **kwargs)
 
     def makedirs(self, path, *args, **kwargs):
-        path = self._connect(path)
-        return super().makedirs(path, *args, **kwargs)
+        fs, path = self._connect(path)
+        return fs.mkdir(path, *args, **kwargs)
 
     def rmdir(self, path, *args, **kwargs):
-        path = self._connect(path)
-        return super().rmdir(path, *args, **kwargs)
+        fs, path = self._connect(path)
+        return fs.rmdir(path, *args, **kwargs)
 
     def info(self, path, *args, **kwargs):
-        path = self._connect(path)
-        return super().info(path, *args, **kwargs)
-
-    def walk(self, *args, **kwargs):
-        arg0 = self._connect(args[0])
-        return [
-            self._add_store_name(p) for p in super().walk(arg0, *args[1:], **kwargs)
-        ]
-
-    def glob(self, *args, **kwargs):
-        arg0 = self._connect(args[0])
-        return [
-            self._add_store_name(p) for p in super().glob(arg0, *args[1:], **kwargs)
-        ]
+        fs, path = self._connect(path)
+        return _with_size(fs.info(path, *args, **kwargs))
+
+    def walk(self, path, *args, as_paths=None, detail=False, **kwargs):
+        """Files below path, with detail=True their infos instead of names."""
+        store_name, path = self._parse_store_name(path)
+        store = self._get_store(store_name)
+        if not detail:
+            res = store.walk(path, *args, **kwargs)
+            return self._add_store_names(store_name, res, as_paths)
+        infos = [_with_size(i) for i in store.walk(path, *args, details=True, **kwargs)]
+        names = self._add_store_names(store_name, [i["name"] for i in infos], False)
+        return [dict(i, name=name) for i, name in zip(infos, names)]
+
+    def _list_files(self, path):
+        store_name, path = self._parse_store_name(path)
+        res = self._get_store(store_name).walk(path)
+        return self._add_store_names(store_name, res, as_paths=False)
+
+    def glob(self, path, *args, as_paths=None, **kwargs):
+        store_name, path = self._parse_store_name(path)
+        res = self._get_store(store_name).glob(path, *args, **kwargs)
+        return self._add_store_names(store_name, res, as_paths)
+
+
+def _with_size(info):
+    """ADL reports the size as `length`, add the `size` other filesystems have."""
+    if "size" not in info and "length" in info:
+        info = dict(info, size=info["length"])
+    return info
 
 
 FILESYSTEMS[AzureDataLakeFileSystem.scheme] = AzureDataLakeFileSystem
@@ -19,13 +19,77 @@ Currently methods that are required to be implemented are:
 - rmdir
 - info -> {"LastModified": dt.datetime}
 
+Batch versions of some methods (exists_many, info_many, cat_many, copy_many,
+remove_many) run on a thread pool by default. Filesystems with native bulk APIs
+override them.
+
 Which filesystem to use is usually inferred from the path/protocol.
 """
-from .util import allow_pathlib, return_pathlib, return_schemes, maybe_remove_scheme
+import builtins
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from glob import glob
+from pathlib import PurePath
+
+from drfs import config
+from drfs.util import prepend_scheme, remove_scheme
+from .cache import InfoCache, ListingCache, cached_listing, invalidates_caches
+from .disk_cache import BlockCachedFile, DiskCache, file_version
+from .util import (
+    AtomicFile,
+    allow_pathlib,
+    atomic_local_file,
+    gather,
+    io_profile_options,
+    is_transient,
+    local_files,
+    map_file,
+    maybe_remove_scheme,
+    on_close,
+    retry,
+    return_pathlib,
+    return_schemes,
+    transfer_options,
+)
+
+# Size of reads when downloading a range of a file.
+_READ_SIZE = 1024 * 1024
 
 FILESYSTEMS = {}
 
 
+def _prefetch_tail(f, n):
+    """Read the last n bytes of f (e.g. a parquet footer) into its cache."""
+    size = getattr(f, "size", None)
+    if size:
+        f.seek(max(size - n, 0))
+        f.read(n)
+        f.seek(0)
+
+
+class BatchError(OSError):
+    """Raised by batch operations after all items have been processed.
+
+    Attributes
+    ----------
+    errors: dict
+        Maps every path which failed to the exception it raised.
+    results: list
+        Results of the operation in input order, None for failed items. Only set
+        by the `*_many` methods.
+    """
+
+    def __init__(self, errors, results=None):
+        self.errors = errors
+        self.results = results
+        path, exc = next(iter(errors.items()))
+        super().__init__(f"{len(errors)} path(s) failed, first was {path}: {exc!r}")
+
+
 class FileSystemBase:
     """File System Base
 
@@ -45,6 +109,28 @@ class FileSystemBase:
         containing a scheme. If set to true this class will strip the scheme as
         specified in the above attribute. E.g. `adl://store/some/file` will be received
         as `/store/some/file
+    as_paths: bool
+        if False, listing methods (ls, walk, glob) return plain strings instead of
+        DRPath objects. Defaults to the `as_paths` config key, can be overridden
+        per call.
+    listings: ListingCache
+        cache for results of ls, walk and glob or None if disabled. It's enabled
+        by passing `listings_ttl` (seconds) > 0, defaults to the `listings_ttl`
+        config key. Changes made through this instance invalidate it.
+    infos: InfoCache
+        cache for results of info, also filled by detailed listings (ls and walk
+        with `detail=True`), or None if disabled. While a path's info is cached,
+        `info` and `exists` don't hit the filesystem. Enabled by passing
+        `info_ttl` (seconds) > 0, defaults to the `info_ttl` config key.
+    disk_cache: DiskCache
+        local on-disk cache for files opened for reading, or None if disabled.
+        It's enabled by passing `disk_cache`, usually through the scheme's
+        `fs_opts` in config: True for the defaults or a dict of DiskCache
+        arguments, e.g. `{directory: /mnt/cache, block_size: 4194304}`.
+    io_profile: str or dict
+        I/O profile used when opening files for reading if no rule of the
+        `io_profile_rules` config key matches, see `io_profile_options`.
+        Usually set per scheme in `fs_opts`, e.g. `io_profile: sequential`.
     """
 
     fs_cls = None  # type: type
@@ -52,7 +138,37 @@ class FileSystemBase:
     is_remote = None  # type: bool
     supports_scheme = True  # type: bool
 
-    def __init__(self, *args, **kwargs):
+    def __init__(
+        self,
+        *args,
+        as_paths=None,
+        listings_ttl=None,
+        listings_maxsize=None,
+        info_ttl=None,
+        info_maxsize=None,
+        disk_cache=None,
+        io_profile=None,
+        **kwargs,
+    ):
+        self.as_paths = config["as_paths"].get(bool) if as_paths is None else as_paths
+        if listings_ttl is None:
+            listings_ttl = config["listings_ttl"].get(float)
+        if listings_maxsize is None:
+            listings_maxsize = config["listings_maxsize"].get(int)
+        self.listings = (
+            ListingCache(listings_ttl, listings_maxsize) if listings_ttl > 0 else None
+        )
+        if info_ttl is None:
+            info_ttl = config["info_ttl"].get(float)
+        if info_maxsize is None:
+            info_maxsize = config["info_maxsize"].get(int)
+        self.infos = InfoCache(info_ttl, info_maxsize) if info_ttl > 0 else None
+        if disk_cache is True:
+            disk_cache = DiskCache()
+        elif isinstance(disk_cache, dict):
+            disk_cache = DiskCache(**disk_cache)
+        self.disk_cache = disk_cache or None
+        self.io_profile = io_profile
         if self.fs_cls is None:
             # Sometimes, like in LocalFileSystem, we don't need underlying fs
             self.fs = None
@@ -61,21 +177,126 @@ class FileSystemBase:
 
     @allow_pathlib
     @maybe_remove_scheme
-    def open(self, path, *args, **kwargs):
-        return self.fs.open(path, *args, **kwargs)
+    def open(self, path, *args, io_profile=None, atomic=False, **kwargs):
+        """Open a file.
+
+        When reading, options of the matching I/O profile (see
+        `io_profile_options`) are added to kwargs; kwargs given explicitly take
+        precedence. Pass `io_profile` to choose a profile for this call, False
+        to use none.
+
+        With `atomic=True` a file opened for writing only appears once it's
+        closed, see `_open_atomic`. It's ignored when reading, modes other than
+        "w" and "x" raise ValueError.
+        """
+        mode = args[0] if args else kwargs.get("mode", "rb")
+        if atomic and ("r" not in mode or "+" in mode):
+            kwargs.pop("mode", None)
+            return self._open_atomic(path, mode, *args[1:], **kwargs)
+        if "r" not in mode:
+            # remote files only appear once closed, listings or infos fetched
+            # in between must not be kept
+            self.invalidate_caches(path)
+            f = self.fs.open(path, *args, **kwargs)
+            return on_close(f, lambda: self.invalidate_caches(path))
+        opts = io_profile_options(
+            prepend_scheme(self.scheme, path),
+            io_profile,
+            self.io_profile,
+        )
+        prefetch_tail = opts.pop("prefetch_tail", 0)
+        kwargs = {**opts, **kwargs}
+        if "+" not in mode and self.disk_cache is not None:
+            kwargs.pop("mode", None)
+            return self._open_cached(path, mode, *args[1:], **kwargs)
+        f = self.fs.open(path, *args, **kwargs)
+        if prefetch_tail:
+            _prefetch_tail(f, prefetch_tail)
+        return f
+
+    def _open_atomic(self, path, mode, *args, **kwargs):
+        """Write to a local temporary file, uploaded with `put` on close.
+
+        Uploads only become visible once complete on object stores, so
+        readers never see partial files. If the with block writing the file
+        raises, nothing is uploaded. Other arguments are passed to the
+        builtin open of the temporary file.
+        """
+        if "x" in mode and self.exists(path):
+            raise FileExistsError(path)
+        fd, tmp = tempfile.mkstemp(prefix="drfs-", suffix=".part")
+        os.close(fd)
+
+        try:
+            return AtomicFile(
+                tmp, mode, lambda tmp: self.put(tmp, path), *args, **kwargs
+            )
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def _open_cached(
+        self, path, mode, *args, encoding=None, errors=None, newline=None, **kwargs
+    ):
+        """Open a file for reading through the disk cache.
+
+        Other arguments are passed on when the file has to be read remotely.
+        Files without a version in their info can't be validated and are never
+        cached.
+        """
+        info = self.info(path)
+        version = file_version(info)
+        if version is None:
+            return self.fs.open(path, mode, *args, **kwargs)
+        cache = self.disk_cache
+        key_parts = (self.scheme, path, version)
+
+        def open_remote():
+            return self.fs.open(path, "rb", *args, **kwargs)
+
+        if cache.block_size:
+            f = io.BufferedReader(
+                BlockCachedFile(cache, open_remote, info["size"], key_parts)
+            )
+        else:
+            f = self._open_cached_file(cache.key(*key_parts), open_remote)
+        if "b" in mode:
+            return f
+        return io.TextIOWrapper(f, encoding=encoding, errors=errors, newline=newline)
+
+    def _open_cached_file(self, key, open_remote):
+        cache = self.disk_cache
+        local = cache.get_path(key)
+        if local is not None:
+            try:
+                return builtins.open(local, "rb")
+            except FileNotFoundError:
+                pass  # evicted meanwhile
+
+        def download(f):
+            with open_remote() as src:
+                shutil.copyfileobj(src, f, 1024 * 1024)
+
+        return builtins.open(cache.put_file(key, download), "rb")
 
     @allow_pathlib
     @maybe_remove_scheme
     def exists(self, path, *args, **kwargs):
+        if not args and not kwargs and self._cached_info(path) is not None:
+            return True
         return self.fs.exists(path, *args, **kwargs)
 
     @return_pathlib
+    @cached_listing
     @return_schemes
     @allow_pathlib
     @maybe_remove_scheme
     def ls(self, path, *args, **kwargs):
-        return self.fs.ls(path, *args, **kwargs)
+        res = self.fs.ls(path, *args, **kwargs)
+        self._cache_infos(res)
+        return res
 
+    @invalidates_caches
     @allow_pathlib
     @maybe_remove_scheme
     def remove(self, path, *args, **kwargs):
@@ -84,27 +305,59 @@ class FileSystemBase:
         except AttributeError:
             return self.fs.rm(path, *args, **kwargs)
 
+    @invalidates_caches
     @allow_pathlib
-    @maybe_remove_scheme
-    def copy(self, path, *args, **kwargs):
+    def copy(self, path, dst, recursive=False, max_workers=None, **kwargs):
+        """Copy a file, or with recursive=True all files below path.
+
+        Files are copied by the storage service where the backend supports it
+        (see `_copy_file`), without passing data through this process. Files of
+        a tree are copied by `max_workers` threads, failures are raised
+        together as a BatchError at the end.
+        """
+        if not recursive:
+            return self._copy_file(path, dst, **kwargs)
+        self._transfer_all(
+            lambda pair: self._copy_file(*pair, **kwargs),
+            self._tree_pairs(path, dst),
+            transfer_options(max_workers).max_workers,
+        )
+
+    @invalidates_caches
+    @allow_pathlib
+    def move(self, path, dst, recursive=False, max_workers=None):
+        """Move a file, or with recursive=True all files below path.
+
+        Like `copy`, data doesn't pass through this process. A tree is moved
+        by copying all files concurrently, then removing the sources. If any
+        copy fails, nothing is removed.
+        """
+        if not recursive:
+            return self._move_file(path, dst)
+        max_workers = transfer_options(max_workers).max_workers
+        pairs = self._tree_pairs(path, dst)
+        self._transfer_all(lambda pair: self._copy_file(*pair), pairs, max_workers)
+        self.remove_many([src for src, _ in pairs], max_workers=max_workers)
+
+    def _copy_file(self, src, dst, **kwargs):
+        """Copy a single file, server side if the wrapped filesystem can."""
+        src, dst = self._fs_path(src), self._fs_path(dst)
         try:
-            return self.fs.copy(path, *args, **kwargs)
+            return self.fs.copy(src, dst, **kwargs)
         except AttributeError:
-            return self.fs.cp(path, *args, **kwargs)
+            return self.fs.cp(src, dst, **kwargs)
 
-    @allow_pathlib
-    @maybe_remove_scheme
-    def move(self, path, *args, **kwargs):
+    def _move_file(self, src, dst):
+        src, dst = self._fs_path(src), self._fs_path(dst)
         try:
-            return self.fs.mv(path, *args, **kwargs)
+            return self.fs.mv(src, dst)
         except AttributeError:
-            return self.fs.move(path, *args, **kwargs)
+            return self.fs.move(src, dst)
 
-    @allow_pathlib
-    @maybe_remove_scheme
     def mv(self, path, *args, **kwargs):
         self.move(path, *args, **kwargs)
 
+    @invalidates_caches
     @allow_pathlib
     @maybe_remove_scheme
     def makedirs(self, path, *args, **kwargs):
@@ -113,6 +366,7 @@ class FileSystemBase:
         except AttributeError:
             return self.fs.mkdir(path, *args, **kwargs)
 
+    @invalidates_caches
     @allow_pathlib
     @maybe_remove_scheme
     def rmdir(self, path, *args, **kwargs):
@@ -121,22 +375,388 @@ class FileSystemBase:
     @allow_pathlib
     @maybe_remove_scheme
     def info(self, path, *args, **kwargs):
-        return self.fs.info(path, *args, **kwargs)
+        if args or kwargs:
+            return self.fs.info(path, *args, **kwargs)
+        res = self._cached_info(path)
+        if res is not None:
+            return dict(res)
+        res = self.fs.info(path)
+        if self.infos is not None and isinstance(res, dict):
+            self.infos.set(path, dict(res))
+        return res
 
     @return_pathlib
+    @cached_listing
     @return_schemes
     @allow_pathlib
     @maybe_remove_scheme
-    def walk(self, *args, **kwargs):
-        return self.fs.walk(*args, **kwargs)
+    def walk(self, path, *args, detail=False, **kwargs):
+        """List all files below path.
+
+        With `detail=True` a list of info dicts is returned instead.
+        """
+        if detail:
+            res = list(self.fs.find(path, *args, detail=True, **kwargs).values())
+            self._cache_infos(res)
+            return res
+        return self.fs.walk(path, *args, **kwargs)
 
     @return_pathlib
+    @cached_listing
     @return_schemes
     @allow_pathlib
     @maybe_remove_scheme
     def glob(self, *args, **kwargs):
         return self.fs.glob(*args, **kwargs)
 
+    def invalidate_caches(self, *paths):
+        """Drop cached listings and infos which may include any of paths."""
+        caches = [self.listings, self.infos]
+        for cache in filter(None, caches):
+            for path in paths:
+                if isinstance(path, (str, PurePath)):
+                    cache.invalidate(path)
+
+    def _cached_info(self, path):
+        infos = self.infos
+        return None if infos is None else infos.get(path)
+
+    def _cache_infos(self, res):
+        """Remember the info dicts of a detailed listing."""
+        infos = self.infos
+        if infos is not None:
+            infos.update(res)
+
+    @allow_pathlib
+    @maybe_remove_scheme
+    def cat(self, path):
+        """Return the contents of a file as bytes."""
+        with self.open(path, "rb") as f:
+            return f.read()
+
+    @allow_pathlib
+    def open_mmap(self, path, cache_dir=None):
+        """Map a file read-only into memory, see `map_file`.
+
+        Remote files are downloaded to `cache_dir` first (defaults to the
+        `mmap_cache_dir` config key or a directory in the system's temp dir).
+        The copy is reused as long as the file's version (ETag, modification
+        time, ...) and size are unchanged. If the filesystem has a disk cache
+        storing whole files, the file is mapped from there instead.
+        """
+        cache = self.disk_cache
+        if cache is not None and not cache.block_size and cache_dir is None:
+            with self.open(path, "rb") as f:
+                if isinstance(getattr(f, "raw", None), io.FileIO):
+                    return map_file(f.name)
+        return map_file(self._local_copy(path, cache_dir))
+
+    def _local_copy(self, path, cache_dir=None):
+        """Download path into cache_dir unless an up to date copy exists."""
+        if cache_dir is None:
+            cache_dir = config["mmap_cache_dir"].get() or os.path.join(
+                tempfile.gettempdir(), "drfs-mmap"
+            )
+        os.makedirs(cache_dir, exist_ok=True)
+        version = file_version(self.info(path))
+        key = hashlib.sha256(path.encode()).hexdigest()[:32]
+        tag = hashlib.sha256(repr(version).encode())
+        target = os.path.join(cache_dir, f"{key}-{tag.hexdigest()[:16]}")
+        if version is not None and os.path.exists(target):
+            return target
+
+        fd, tmp = tempfile.mkstemp(dir=cache_dir, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f, self.open(path, "rb") as src:
+                shutil.copyfileobj(src, f, 1024 * 1024)
+            # other processes may read target, only replace it as a whole
+            os.replace(tmp, target)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        for old in glob(os.path.join(cache_dir, key + "-*")):
+            if old != target:
+                try:
+                    os.remove(old)
+                except OSError:
+                    pass
+        return target
+
+    def exists_many(self, paths, max_workers=None):
+        """Check if many paths exist, see `_map_many`."""
+        return self._map_many(self.exists, paths, max_workers)
+
+    def info_many(self, paths, max_workers=None):
+        """Get info for many paths, see `_map_many`."""
+        return self._map_many(self.info, paths, max_workers)
+
+    def cat_many(self, paths, max_workers=None):
+        """Get the contents of many files, see `_map_many`."""
+        return self._map_many(self.cat, paths, max_workers)
+
+    def copy_many(self, pairs, max_workers=None):
+        """Copy many files, see `_map_many`.
+
+        Parameters
+        ----------
+        pairs: iterable
+            (src, dst) tuples, errors are reported under src.
+        """
+        pairs = list(pairs)
+        return self._map_many(
+            lambda pair: self.copy(*pair),
+            pairs,
+            max_workers,
+            keys=[src for src, _ in pairs],
+        )
+
+    def remove_many(self, paths, recursive=False, max_workers=None):
+        """Remove many paths, see `_map_many`."""
+        return self._map_many(
+            lambda path: self.remove(path, recursive=recursive), paths, max_workers
+        )
+
+    def _map_many(self, func, items, max_workers=None, keys=None):
+        """Apply func to all items on a thread pool.
+
+        Parameters
+        ----------
+        func: callable
+            called with each item.
+        items: iterable
+        max_workers: int
+            size of the thread pool, defaults to ThreadPoolExecutor's default.
+        keys: list
+            keys for items in BatchError.errors, defaults to str(item).
+
+        Returns
+        -------
+        results: list
+            results in the same order as items.
+
+        Raises
+        ------
+        BatchError
+            after all items are processed, if any of them failed.
+        """
+        items = list(items)
+        if keys is None:
+            keys = [str(item) for item in items]
+
+        def call(item):
+            try:
+                return func(item), None
+            except Exception as e:
+                return None, e
+
+        with ThreadPoolExecutor(max_workers) as pool:
+            outcomes = list(pool.map(call, items))
+        results = [res for res, _ in outcomes]
+        errors = {key: e for key, (_, e) in zip(keys, outcomes) if e is not None}
+        if errors:
+            raise BatchError(errors, results)
+        return results
+
+    def _fsspec_cat_many(self, paths):
+        """cat_many using fsspec's cat, which accepts a list of paths."""
+        from drfs.path import asstr
+
+        paths = list(paths)
+        keys = [str(p) for p in paths]
+        fs_paths = [asstr(p) for p in paths]
+        if not self.supports_scheme:
+            fs_paths = [remove_scheme(p, raise_=False) for p in fs_paths]
+        fs_paths = [self.fs._strip_protocol(p) for p in fs_paths]
+        out = self.fs.cat(fs_paths, on_error="return")
+        results, errors = [], {}
+        for key, fs_path in zip(keys, fs_paths):
+            res = out.get(fs_path, FileNotFoundError(key))
+            if isinstance(res, Exception):
+                errors[key] = res
+                res = None
+            results.append(res)
+        if errors:
+            raise BatchError(errors, results)
+        return results
+
+    def put(
+        self,
+        filename,
+        path,
+        recursive=False,
+        max_workers=None,
+        part_size=None,
+        retries=None,
+        **kwargs,
+    ):
+        """Upload a local file, or with recursive=True the files of a directory.
+
+        Many files are uploaded concurrently by `max_workers` threads, failures
+        are raised together as a BatchError at the end. Failed uploads are
+        retried `retries` times. Defaults come from the `transfer` config key.
+        Other kwargs are passed to the backend's upload, see `_put_file`.
+        """
+        from drfs.path import asstr
+
+        filename, path = asstr(filename), asstr(path)
+        opts = transfer_options(max_workers, part_size, retries)
+        self.invalidate_caches(path)
+        try:
+            with ThreadPoolExecutor(opts.max_workers) as pool:
+                if not os.path.isdir(filename):
+                    return self._put_file(filename, path, opts, pool, **kwargs)
+                if not recursive:
+                    raise IsADirectoryError(filename)
+                pairs = [
+                    (local, path.rstrip("/") + "/" + rel)
+                    for local, rel in local_files(filename)
+                ]
+                self._transfer_all(
+                    lambda pair: self._put_file(*pair, opts, pool, **kwargs),
+                    pairs,
+                    opts.max_workers,
+                )
+        finally:
+            # infos fetched during the upload describe the old objects
+            self.invalidate_caches(path)
+
+    def get(
+        self,
+        path,
+        filename,
+        recursive=False,
+        max_workers=None,
+        part_size=None,
+        retries=None,
+    ):
+        """Download a file, or with recursive=True all files below path.
+
+        Files bigger than `part_size` are downloaded in ranges by `max_workers`
+        threads, many files are downloaded concurrently. Files only appear
+        under their name once complete. Failed downloads are retried `retries`
+        times. Defaults come from the `transfer` config key.
+        """
+        from drfs.path import asstr
+
+        path, filename = asstr(path), asstr(filename)
+        opts = transfer_options(max_workers, part_size, retries)
+        with ThreadPoolExecutor(opts.max_workers) as pool:
+            if not recursive:
+                return self._get_file(path, filename, opts, pool)
+            pairs = [
+                (remote, os.path.join(filename, *rel.split("/")))
+                for remote, rel in self._relative_files(path)
+            ]
+            self._transfer_all(
+                lambda pair: self._get_file(*pair, opts, pool),
+                pairs,
+                opts.max_workers,
+            )
+
+    def _put_file(self, filename, path, opts, pool, **kwargs):
+        """Upload a single file.
+
+        Uses the backend's put_file if it has one, otherwise the file is
+        streamed through open in chunks of part_size. Subclasses with native
+        (e.g. multipart) uploads override this; `pool` may run their parts.
+        """
+        put_file = getattr(self.fs, "put_file", None)
+        if put_file is not None:
+
+            def upload():
+                put_file(filename, self._fs_path(path), **kwargs)
+
+        else:
+
+            def upload():
+                with builtins.open(filename, "rb") as src:
+                    with self.open(path, "wb", **kwargs) as dst:
+                        shutil.copyfileobj(src, dst, opts.part_size)
+
+        retry(upload, opts.retries, is_transient)
+
+    def _get_file(self, path, filename, opts, pool):
+        """Download a single file.
+
+        Files bigger than part_size are read in ranges by the threads of pool.
+        Others are downloaded by the backend's get_file if it has one or
+        streamed through open.
+        """
+        size = self.info(path).get("size")
+        with atomic_local_file(filename, size) as tmp:
+            if size and size > opts.part_size:
+                gather(
+                    pool.submit(
+                        self._get_range, path, tmp, offset, opts.part_size, opts.retries
+                    )
+                    for offset in range(0, size, opts.part_size)
+                )
+                return
+            get_file = getattr(self.fs, "get_file", None)
+            if get_file is not None:
+
+                def download():
+                    get_file(self._fs_path(path), tmp)
+
+            else:
+
+                def download():
+                    with self.open(path, "rb") as src:
+                        with builtins.open(tmp, "wb") as dst:
+                            shutil.copyfileobj(src, dst, opts.part_size)
+
+            retry(download, opts.retries, is_transient)
+
+    def _get_range(self, path, filename, offset, length, retries):
+        """Copy length bytes at offset of path into the same range of filename."""
+
+        def download():
+            # own handles, so that ranges can be downloaded concurrently
+            with self.open(path, "rb") as src, builtins.open(filename, "r+b") as dst:
+                src.seek(offset)
+                dst.seek(offset)
+                remaining = length
+                while remaining > 0:
+                    chunk = src.read(min(remaining, _READ_SIZE))
+                    if not chunk:
+                        break
+                    dst.write(chunk)
+                    remaining -= len(chunk)
+
+        retry(download, retries, is_transient)
+
+    def _relative_files(self, path):
+        """Return (path, path relative to the given one) of all files below it."""
+        root = prepend_scheme(self.scheme, path).rstrip("/")
+        return [
+            (remote, prepend_scheme(self.scheme, remote)[len(root) + 1 :])
+            for remote in self._list_files(path)
+        ]
+
+    def _tree_pairs(self, path, dst):
+        """(src, dst) pairs to copy all files below path to dst."""
+        dst = dst.rstrip("/")
+        return [(src, f"{dst}/{rel}") for src, rel in self._relative_files(path)]
+
+    def _list_files(self, path):
+        """Paths of all files below path, used by recursive transfers."""
+        return [
+            info["name"]
+            for info in self.walk(path, detail=True, as_paths=False)
+            if info.get("type") != "directory"
+        ]
+
+    def _transfer_all(self, func, pairs, max_workers):
+        """Apply func to (src, dst) pairs on a thread pool.
+
+        Raises a BatchError with errors keyed by src at the end.
+        """
+        self._map_many(func, pairs, max_workers, keys=[src for src, _ in pairs])
+
+    def _fs_path(self, path):
+        """path as expected by the wrapped filesystem."""
+        return path if self.supports_scheme else remove_scheme(path, raise_=False)
+
     def cp(self, *args, **kwargs):
         """cp is an alias for copy"""
         return self.copy(*args, **kwargs)
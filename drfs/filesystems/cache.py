@@ -0,0 +1,196 @@
+"""In-process caches for remote filesystem calls."""
+import bisect
+import re
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from drfs.util import remove_scheme
+
+_MAGIC = re.compile(r"[*?\[]")
+
+
+def _norm(path):
+    return remove_scheme(str(path), raise_=False).rstrip("/")
+
+
+def _base(path):
+    """Directory part of path which doesn't contain glob magic."""
+    match = _MAGIC.search(path)
+    if match is None:
+        return path
+    return path[: match.start()].rpartition("/")[0]
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after `ttl` seconds.
+
+    At most `maxsize` entries are kept. Use `invalidate` after changing a path
+    so that nothing including it is served stale. Entries are indexed by the
+    path they refer to, so invalidating only touches the affected ones.
+
+    Attributes
+    ----------
+    hits: int
+        number of lookups answered from the cache.
+    misses: int
+        number of lookups that had to go to the filesystem.
+    """
+
+    def __init__(self, ttl, maxsize=10000):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        # keys by their base path, and all base paths in sorted order
+        self._keys = {}
+        self._bases = []
+        self._lock = threading.Lock()
+
+    def _key_path(self, key):
+        """Path a key refers to, as returned by `_norm`."""
+        return key
+
+    def _add(self, key):
+        base = _base(self._key_path(key))
+        keys = self._keys.get(base)
+        if keys is None:
+            keys = self._keys[base] = set()
+            bisect.insort(self._bases, base)
+        keys.add(key)
+
+    def _remove(self, key):
+        del self._entries[key]
+        base = _base(self._key_path(key))
+        keys = self._keys[base]
+        keys.discard(key)
+        if not keys:
+            del self._keys[base]
+            del self._bases[bisect.bisect_left(self._bases, base)]
+
+    def get(self, key):
+        """Return the cached value for key or None if missing or expired."""
+        with self._lock:
+            try:
+                expires, value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            if expires < time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            if key not in self._entries:
+                self._add(key)
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, path=None):
+        """Drop entries for path, for its parents and for anything below it.
+
+        If path is None the whole cache is cleared.
+        """
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self._keys.clear()
+                self._bases.clear()
+                return
+            path = _norm(path)
+            # the path itself, its parents and the root
+            bases = [path]
+            while bases[-1]:
+                bases.append(bases[-1].rpartition("/")[0])
+            for base in bases:
+                for key in list(self._keys.get(base, ())):
+                    self._remove(key)
+            # everything below it, a contiguous range of the sorted bases
+            start = end = bisect.bisect_left(self._bases, path + "/")
+            while end < len(self._bases) and self._bases[end].startswith(path + "/"):
+                end += 1
+            for base in self._bases[start:end]:
+                for key in self._keys.pop(base):
+                    del self._entries[key]
+            del self._bases[start:end]
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+class ListingCache(TTLCache):
+    """Cache for directory listings (ls, glob, walk).
+
+    Keys are (method name, normalized path, args, kwargs) tuples.
+    """
+
+    def _key_path(self, key):
+        return key[1]
+
+
+class InfoCache(TTLCache):
+    """Cache for results of `info`, keyed by path.
+
+    It's filled by `info` itself and by detailed listings, which already return
+    the info of every child.
+    """
+
+    def get(self, path):
+        return super().get(_norm(path))
+
+    def set(self, path, info):
+        super().set(_norm(path), info)
+
+    def update(self, infos):
+        """Store many info dicts, each must have a "name"."""
+        for info in infos:
+            if isinstance(info, dict) and "name" in info:
+                self.set(info["name"], dict(info))
+
+
+def cached_listing(func):
+    """Serve the results of a listing method from `self.listings` if enabled.
+
+    Results are cached as tuples of strings, so they have to be converted to
+    paths afterwards (decorate with return_pathlib on top of this).
+    """
+
+    @wraps(func)
+    def wrapper(self, path, *args, **kwargs):
+        cache = self.listings
+        if cache is None:
+            return func(self, path, *args, **kwargs)
+        try:
+            key = (func.__name__, _norm(path), args, tuple(sorted(kwargs.items())))
+            hash(key)
+        except TypeError:
+            return func(self, path, *args, **kwargs)
+        res = cache.get(key)
+        if res is None:
+            res = tuple(func(self, path, *args, **kwargs))
+            cache.set(key, res)
+        return list(res)
+
+    return wrapper
+
+
+def invalidates_caches(func):
+    """Invalidate cached data of all paths passed to a method changing them."""
+
+    @wraps(func)
+    def wrapper(self, path, *args, **kwargs):
+        try:
+            return func(self, path, *args, **kwargs)
+        finally:
+            self.invalidate_caches(path, *args, *kwargs.values())
+
+    return wrapper
@@ -0,0 +1,290 @@
+"""Local on-disk cache for remote reads.
+
+Entries are whole files or fixed-size blocks of them, stored one per file under
+a cache directory. Keys include the file's version (ETag, modification time,
+...), so changed files are never served stale; old versions simply age out.
+
+Several processes can share a directory: entries are written to temporary
+files and renamed into place, and eviction runs under an exclusive file lock.
+Recency is tracked with the entries' modification times.
+"""
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # windows
+    fcntl = None
+
+# Keys of info dicts which change when a file is overwritten, in order of
+# preference.
+VERSION_KEYS = (
+    "ETag",
+    "etag",
+    "md5Hash",
+    "generation",
+    "LastModified",
+    "last_modified",
+    "updated",
+    "mtime",
+)
+
+DEFAULT_MAX_SIZE = 10 * 1024 * 1024 * 1024  # 10 GiB
+
+_TMP_PREFIX = ".tmp-"
+_LOCK_NAME = ".lock"
+
+
+def file_version(info):
+    """Values of `info` identifying the file's current content, or None."""
+    version = [info.get(k) for k in VERSION_KEYS if info.get(k) is not None]
+    if not version:
+        return None
+    return [info.get("size")] + version
+
+
+class DiskCache:
+    """Size-bounded LRU cache of file contents on local disk.
+
+    Parameters
+    ----------
+    directory: str
+        where entries are stored, defaults to a directory in the system's temp
+        dir. May be shared by many processes.
+    max_size: int
+        size budget in bytes, least recently used entries are evicted when it
+        is exceeded.
+    block_size: int
+        if given files are cached in blocks of this many bytes, otherwise as
+        whole files.
+    """
+
+    def __init__(self, directory=None, max_size=DEFAULT_MAX_SIZE, block_size=None):
+        if directory is None:
+            directory = os.path.join(tempfile.gettempdir(), "drfs-cache")
+        self.directory = str(directory)
+        self.max_size = max_size
+        self.block_size = block_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._size = None  # estimate, updated by eviction scans
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def key(*parts):
+        """Key of an entry, e.g. key(scheme, path, version, block_index)."""
+        return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+    def _entry(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def get_path(self, key):
+        """Return the local path of an entry or None on a miss.
+
+        The entry may be evicted by another process before it's opened.
+        """
+        path = self._entry(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            self._count("misses")
+            return None
+        self._count("hits")
+        return path
+
+    def get(self, key):
+        """Return the contents of an entry or None on a miss."""
+        path = self._entry(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            self._count("misses")
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass  # evicted meanwhile, we still got the data
+        self._count("hits")
+        return data
+
+    def put(self, key, data):
+        """Store data under key, return the entry's local path."""
+        return self.put_file(key, lambda f: f.write(data))
+
+    def put_file(self, key, write):
+        """Store an entry written by write(f) to a binary file object.
+
+        The entry becomes visible atomically once it's complete.
+        """
+        path = self._entry(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=_TMP_PREFIX)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+                size = f.tell()
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self._added(size)
+        return path
+
+    def _count(self, name, n=1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + n)
+
+    def _added(self, size):
+        with self._lock:
+            if self._size is not None:
+                self._size += size
+            full = self._size is None or self._size > self.max_size
+        if full:
+            self.evict()
+
+    def _scan(self):
+        """Return (mtime, size, path) of all entries."""
+        entries = []
+        for sub in os.scandir(self.directory):
+            if not sub.is_dir():
+                continue
+            for entry in os.scandir(sub.path):
+                if entry.name.startswith(_TMP_PREFIX):
+                    continue
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, entry.path))
+        return entries
+
+    def evict(self):
+        """Remove least recently used entries until the size budget is met.
+
+        Evicts down to 90% of max_size, so that not every write triggers a
+        scan of the directory.
+        """
+        with self._file_lock():
+            entries = sorted(self._scan())
+            total = sum(size for _, size, _ in entries)
+            evicted = 0
+            if total > self.max_size:
+                for _, size, path in entries:
+                    if total <= self.max_size * 0.9:
+                        break
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+                    total -= size
+                    evicted += 1
+        with self._lock:
+            self._size = total
+            self.evictions += evicted
+
+    @contextmanager
+    def _file_lock(self):
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.directory, _LOCK_NAME), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def clear(self):
+        """Remove all entries."""
+        with self._file_lock():
+            for sub in os.scandir(self.directory):
+                if sub.is_dir():
+                    shutil.rmtree(sub.path, ignore_errors=True)
+        with self._lock:
+            self._size = 0
+
+    def stats(self):
+        """Hits, misses and evictions of this instance, size of the directory."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": self._size,
+            }
+
+
+class BlockCachedFile(io.RawIOBase):
+    """Read-only file whose blocks are served from a DiskCache.
+
+    Missing blocks are read from `open_remote()`, which is only called once a
+    block is missing. Wrap it in io.BufferedReader for efficient small reads.
+    """
+
+    def __init__(self, cache, open_remote, size, key_parts):
+        super().__init__()
+        self.cache = cache
+        self.size = size
+        self._open_remote = open_remote
+        self._remote = None
+        self._key_parts = key_parts
+        self._pos = 0
+        self._block = (None, b"")
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += self.size
+        if offset < 0:
+            raise ValueError(f"negative seek position {offset}")
+        self._pos = offset
+        return offset
+
+    def readinto(self, b):
+        if self._pos >= self.size:
+            return 0
+        block_size = self.cache.block_size
+        index, start = divmod(self._pos, block_size)
+        data = self._get_block(index)
+        n = min(len(b), len(data) - start)
+        b[:n] = data[start : start + n]
+        self._pos += n
+        return n
+
+    def _get_block(self, index):
+        if self._block[0] == index:
+            return self._block[1]
+        key = self.cache.key(*self._key_parts, index)
+        data = self.cache.get(key)
+        if data is None:
+            if self._remote is None:
+                self._remote = self._open_remote()
+            self._remote.seek(index * self.cache.block_size)
+            data = self._remote.read(self.cache.block_size)
+            self.cache.put(key, data)
+        self._block = (index, data)
+        return data
+
+    def close(self):
+        if self._remote is not None:
+            self._remote.close()
+            self._remote = None
+        super().close()
@@ -1,16 +1,22 @@
 import gcsfs
 
 from drfs.filesystems.base import FILESYSTEMS, FileSystemBase
+from drfs.filesystems.cache import invalidates_caches
 from drfs.filesystems.util import allow_pathlib
 
 
 class GCSFileSystem(FileSystemBase):
-    """Wrapper for dask's GCSFileSystem."""
+    """Wrapper for dask's GCSFileSystem.
+
+    gcsfs copies objects with the rewrite API, so copy and move don't pass data
+    through this process.
+    """
 
     fs_cls = gcsfs.GCSFileSystem
     scheme = "gs"
     is_remote = True
 
+    @invalidates_caches
     @allow_pathlib
     def remove(self, *args, **kwargs):
         """Remove file."""
@@ -19,6 +25,10 @@ class GCSFileSystem(FileSystemBase):
     def makedirs(self, *args, **kwargs):
         raise NotImplementedError
 
+    def cat_many(self, paths, max_workers=None):
+        """Get the contents of many files, gcsfs fetches them concurrently."""
+        return self._fsspec_cat_many(paths)
+
 
 FILESYSTEMS["gs"] = GCSFileSystem
 FILESYSTEMS["gcs"] = GCSFileSystem
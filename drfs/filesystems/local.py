@@ -1,13 +1,56 @@
 import builtins
 import datetime
+import errno
 import os
 import shutil
-from glob import glob as glob_
+import stat
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from glob import glob as glob_, iglob as iglob_
+from itertools import islice
 
 import pytz
 
-from drfs.filesystems.util import allow_pathlib, return_pathlib
-from .base import FILESYSTEMS, FileSystemBase
+from drfs.filesystems.util import (
+    AtomicFile,
+    allow_pathlib,
+    is_batch,
+    iter_pathlib,
+    map_file,
+    return_pathlib,
+    temp_name,
+)
+from .base import FILESYSTEMS, BatchError, FileSystemBase
+
+# Number of files unlinked by a single task of a batch remove.
+_RM_CHUNK_SIZE = 1000
+
+# Files larger than this are copied in chunks of this size by many threads.
+_COPY_CHUNK_SIZE = 256 * 1024 * 1024
+# Buffer size when the kernel can't copy for us.
+_COPY_BUFSIZE = 1024 * 1024
+# FICLONE ioctl (linux/fs.h), clones a file on btrfs, xfs, ...
+_FICLONE = 0x40049409
+# Errors meaning that a copy method isn't supported for these files.
+_COPY_UNSUPPORTED = {
+    errno.EBADF,
+    errno.EINVAL,
+    errno.ENOSYS,
+    errno.ENOTSOCK,
+    errno.ENOTSUP,
+    errno.EOPNOTSUPP,
+    errno.EPERM,
+    errno.ETXTBSY,
+    errno.EXDEV,
+}
+
+# Directories known to exist, so writing many files into the same directories
+# doesn't call os.makedirs every time. Shared by all instances. Keys are paths
+# as they were given; if a directory disappears anyway, open recreates it.
+_KNOWN_DIRS = {}
+_KNOWN_DIRS_LOCK = threading.Lock()
+_KNOWN_DIRS_MAXSIZE = 10000
 
 
 class LocalFileSystem(FileSystemBase):
@@ -18,10 +61,51 @@ class LocalFileSystem(FileSystemBase):
     is_remote = False
 
     @allow_pathlib
-    def open(self, path, *args, **kwargs):
-        """Open a file."""
-        self._makedirs_parent(path)
-        return builtins.open(path, *args, **kwargs)
+    def open(self, path, *args, atomic=False, **kwargs):
+        """Open a file.
+
+        When writing, the parent directory is created if it doesn't exist. With
+        `atomic=True` data is written to a temporary file in the same
+        directory, which replaces path once closed. A failed writer never
+        leaves a partial file behind. Modes other than "w" and "x" raise
+        ValueError then, read-only modes ignore it.
+        """
+        mode = args[0] if args else kwargs.get("mode", "r")
+        if _is_read_only(mode):
+            return builtins.open(path, *args, **kwargs)
+        open_ = builtins.open
+        if atomic:
+            kwargs.pop("mode", None)
+            open_, args = self._open_atomic, (mode, *args[1:])
+        dir_ = os.path.dirname(path)
+        _makedirs(dir_)
+        try:
+            return open_(path, *args, **kwargs)
+        except FileNotFoundError:
+            # directory may have been removed by someone else since we saw it
+            if not _forget_dirs([dir_]):
+                raise
+        _makedirs(dir_)
+        return open_(path, *args, **kwargs)
+
+    def _open_atomic(self, path, mode, *args, **kwargs):
+        if "x" in mode:
+
+            def commit(tmp):
+                # fails if path exists, unlike a rename
+                os.link(tmp, path)
+
+        else:
+
+            def commit(tmp):
+                os.replace(tmp, path)
+
+        return AtomicFile(temp_name(path), mode, commit, *args, **kwargs)
+
+    @allow_pathlib
+    def open_mmap(self, path, cache_dir=None):
+        """Map a file read-only into memory, see `map_file`."""
+        return map_file(path)
 
     @allow_pathlib
     def exists(self, path):
@@ -30,76 +114,516 @@ class LocalFileSystem(FileSystemBase):
 
     @allow_pathlib
     def _makedirs_parent(self, path):
-        dir_ = os.path.dirname(path)
-        os.makedirs(dir_, exist_ok=1)
+        _makedirs(os.path.dirname(path))
 
     @allow_pathlib
     def makedirs(self, *args, **kwargs):
         os.makedirs(*args, **kwargs)
 
+    def remove(self, path, recursive=False, max_workers=None):
+        """Remove a file or a directory which may be non-empty.
+
+        If path is a list, all paths are processed: the files to delete are
+        collected first and unlinked in parallel by `max_workers` threads.
+        Failures don't stop the removal of other paths, they are raised
+        together as a BatchError at the end.
+        """
+        if is_batch(path):
+            paths = list(map(str, path))
+            try:
+                return self._remove_many(paths, recursive, max_workers)
+            finally:
+                _forget_dirs(paths)
+        return self._remove(path, recursive)
+
     @allow_pathlib
-    def remove(self, path, recursive=False):
-        """Remove a file or a directory which may be non-empty."""
+    def _remove(self, path, recursive=False):
         try:
             os.remove(path)
         except (IsADirectoryError, PermissionError):
             if not recursive:
                 self.rmdir(path)
             else:
-                shutil.rmtree(path)
+                try:
+                    shutil.rmtree(path)
+                finally:
+                    _forget_dirs([path])
+
+    def remove_many(self, paths, recursive=False, max_workers=None):
+        """Remove many paths, see `remove`."""
+        paths = list(paths)
+        results = [None] * len(paths)
+        try:
+            self.remove(paths, recursive=recursive, max_workers=max_workers)
+        except BatchError as e:
+            raise BatchError(e.errors, results) from None
+        return results
+
+    def _remove_many(self, paths, recursive, max_workers):
+        errors = {}
+        files, dirs = [], []
+        for path in paths:
+            try:
+                self._collect_removal(path, recursive, files, dirs)
+            except OSError as e:
+                errors[path] = e
+
+        chunks = [
+            files[i : i + _RM_CHUNK_SIZE] for i in range(0, len(files), _RM_CHUNK_SIZE)
+        ]
+        with ThreadPoolExecutor(max_workers) as pool:
+            for chunk_errors in pool.map(_unlink_all, chunks):
+                errors.update(chunk_errors)
+
+        # dirs are collected parents first
+        for dir_ in reversed(dirs):
+            try:
+                os.rmdir(dir_)
+            except OSError as e:
+                errors[dir_] = e
+        if errors:
+            raise BatchError(errors)
+
+    @staticmethod
+    def _collect_removal(path, recursive, files, dirs):
+        if not os.path.isdir(path) or os.path.islink(path):
+            if not os.path.lexists(path):
+                raise FileNotFoundError(path)
+            files.append(path)
+            return
+        dirs.append(path)
+        if not recursive:
+            return
+        stack = [path]
+        while stack:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        dirs.append(entry.path)
+                        stack.append(entry.path)
+                    else:
+                        files.append(entry.path)
 
     @return_pathlib
     @allow_pathlib
-    def ls(self, path):
-        """List directory."""
-        if os.path.exists(path):
-            return list(map(lambda x: os.path.join(path, x), os.listdir(path)))
-        return list()
+    def ls(self, path, detail=False):
+        """List directory.
+
+        With `detail=True` info dicts (see `info`) are returned instead of
+        paths. They are built from the stat results os.scandir caches.
+        """
+        if not os.path.exists(path):
+            return list()
+        if detail:
+            with os.scandir(path) as it:
+                return [_entry_info(entry) for entry in it]
+        return list(map(lambda x: os.path.join(path, x), os.listdir(path)))
 
     @allow_pathlib
-    def move(self, src, dst):
-        """Move file or directory. Source parent dir will be created."""
+    def move(self, src, dst, recursive=False, max_workers=None):
+        """Move file or directory with all its contents.
+
+        The parent dir of dst will be created. Within a device this is a
+        rename, otherwise files are copied with `copy_file` and keep their
+        permission bits and times.
+        """
         self._makedirs_parent(dst)
-        shutil.move(src, dst)
+        is_dir = os.path.isdir(src)
+        # across devices shutil falls back to copying, let it use copy_file
+        shutil.move(src, dst, copy_function=_move_file)
+        if is_dir:
+            _forget_dirs([src])
 
     @allow_pathlib
     def mv(self, src, dst):
         self.move(src, dst)
 
     @allow_pathlib
-    def copy(self, src, dst):
+    def copy(self, src, dst, recursive=False, chunk_size=None, max_workers=None):
+        """Copy a file, or a directory tree if recursive is True.
+
+        Data is copied by the kernel where possible, see `copy_file`. Files of a
+        tree are copied by `max_workers` threads; failures don't stop the copy
+        of other files, they are raised together as a BatchError at the end.
+        """
+        if recursive and os.path.isdir(src):
+            return self._copy_tree(str(src), str(dst), chunk_size, max_workers)
         self._makedirs_parent(dst)
-        shutil.copyfile(src, dst)
+        copy_file(src, dst, chunk_size=chunk_size, max_workers=max_workers)
+
+    def put(
+        self,
+        filename,
+        path,
+        recursive=False,
+        max_workers=None,
+        part_size=None,
+        retries=None,
+    ):
+        """Upload is a copy on local disk, see `copy`."""
+        self.copy(
+            filename,
+            path,
+            recursive=recursive,
+            chunk_size=part_size,
+            max_workers=max_workers,
+        )
+
+    def get(
+        self,
+        path,
+        filename,
+        recursive=False,
+        max_workers=None,
+        part_size=None,
+        retries=None,
+    ):
+        """Download is a copy on local disk, see `copy`."""
+        self.copy(
+            path,
+            filename,
+            recursive=recursive,
+            chunk_size=part_size,
+            max_workers=max_workers,
+        )
+
+    def _copy_tree(self, src, dst, chunk_size=None, max_workers=None):
+        pairs = []
+        for root, dirs, files in os.walk(src):
+            dst_root = os.path.join(dst, os.path.relpath(root, src))
+            _makedirs(dst_root)
+            pairs.extend(
+                (os.path.join(root, f), os.path.join(dst_root, f)) for f in files
+            )
+
+        def copy(pair):
+            try:
+                # big files are chunked on their own pool, don't nest pools
+                copy_file(*pair, chunk_size=chunk_size, max_workers=1)
+            except OSError as e:
+                return pair[0], e
+
+        with ThreadPoolExecutor(max_workers) as pool:
+            errors = dict(filter(None, pool.map(copy, pairs)))
+        if errors:
+            raise BatchError(errors)
 
     @allow_pathlib
     def rmdir(self, path):
         """Remove directory."""
-        os.rmdir(path)
+        try:
+            os.rmdir(path)
+        finally:
+            _forget_dirs([path])
 
     @allow_pathlib
     def info(self, path):
-        """Get a dict with only LastModified time in UTC."""
-        mtime = os.path.getmtime(path)
-        return {"LastModified": datetime.datetime.fromtimestamp(mtime, pytz.UTC)}
+        """Get details of a file with a single stat call.
+
+        Keys follow fsspec: name, size, type ("file", "directory" or "other"),
+        mtime (timestamp), ino, islink, plus LastModified (datetime in UTC).
+        """
+        st = os.lstat(path)
+        islink = stat.S_ISLNK(st.st_mode)
+        if islink:
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                # broken link, describe the link itself
+                pass
+        return _stat_info(path, st, islink)
 
     @return_pathlib
     @allow_pathlib
-    def walk(self, path):
-        """Walk over all files in this directory (recursively)."""
+    def walk(self, path, detail=False):
+        """Walk over all files in this directory (recursively).
+
+        With `detail=True` info dicts (see `info`) are returned instead of
+        paths.
+        """
+        if detail:
+            return [_entry_info(entry) for entry in _scandir_entries(path)]
         return [
             os.path.join(root, f) for root, dirs, files in os.walk(path) for f in files
         ]
 
+    @iter_pathlib
+    @allow_pathlib
+    def iwalk(self, path, maxdepth=None, limit=None):
+        """Lazily walk over all files in this directory (recursively).
+
+        Parameters
+        ----------
+        path: str
+            directory to walk
+        maxdepth: int
+            if given, descend at most this many levels; 1 yields only the
+            files directly inside path.
+        limit: int
+            stop after yielding this many files.
+        """
+        files = (entry.path for entry in _scandir_entries(path, maxdepth))
+        return islice(files, limit)
+
     @return_pathlib
     @allow_pathlib
     def glob(self, path):
         """Find files by glob-matching."""
         return glob_(path)
 
+    @iter_pathlib
+    @allow_pathlib
+    def iglob(self, path, recursive=False, limit=None):
+        """Lazily find files by glob-matching, stop after `limit` results."""
+        return islice(iglob_(path, recursive=recursive), limit)
+
     @allow_pathlib
     def touch(self, path):
         self.open(path, "w").close()
 
 
+def _move_file(src, dst):
+    """Copy function of `move`, keeps the metadata like a rename would."""
+    copy_file(src, dst)
+    shutil.copystat(src, dst)
+    return dst
+
+
+def copy_file(src, dst, chunk_size=None, max_workers=None):
+    """Copy the contents of file src to dst without passing through Python.
+
+    On Linux the data is cloned (reflink) if the filesystem supports it,
+    otherwise copied by os.copy_file_range or os.sendfile, falling back to
+    reading and writing large blocks. Elsewhere shutil.copyfile is used, which
+    knows the platform's fast paths.
+
+    Files bigger than `chunk_size` (default 256 MiB) are split into chunks of
+    that size which are copied by `max_workers` threads; max_workers=1 disables
+    this.
+    """
+    chunk_size = chunk_size or _COPY_CHUNK_SIZE
+    size = os.stat(src).st_size
+    if _samefile(src, dst):
+        raise shutil.SameFileError(f"{src!r} and {dst!r} are the same file")
+    chunked = size > chunk_size and max_workers != 1 and hasattr(os, "pwrite")
+    if not chunked and not sys.platform.startswith("linux"):
+        shutil.copyfile(src, dst)
+        return dst
+    with builtins.open(src, "rb") as fsrc, builtins.open(dst, "wb") as fdst:
+        src_fd, dst_fd = fsrc.fileno(), fdst.fileno()
+        if _reflink(src_fd, dst_fd):
+            return dst
+        if not chunked:
+            # until EOF, size may be wrong for special files
+            _copy_range(src_fd, dst_fd, 0, None)
+            return dst
+        os.ftruncate(dst_fd, size)
+        with ThreadPoolExecutor(max_workers) as pool:
+            futures = [
+                pool.submit(_copy_range, src_fd, dst_fd, offset, chunk_size, True)
+                for offset in range(0, size, chunk_size)
+            ]
+            for future in futures:
+                future.result()
+    return dst
+
+
+def _samefile(src, dst):
+    try:
+        return os.path.samefile(src, dst)
+    except OSError:
+        return False
+
+
+def _reflink(src_fd, dst_fd):
+    try:
+        import fcntl
+    except ImportError:  # windows
+        return False
+    try:
+        fcntl.ioctl(dst_fd, _FICLONE, src_fd)
+    except OSError:
+        return False
+    return True
+
+
+def _copy_range(src_fd, dst_fd, offset, length, positional=False):
+    """Copy length bytes (None: until EOF) from offset of src to dst.
+
+    With positional=False the file offset of dst_fd must be at `offset` and is
+    advanced; with positional=True file offsets aren't used at all, so many
+    threads can share the descriptors.
+    """
+    end = sys.maxsize if length is None else offset + length
+    if hasattr(os, "copy_file_range"):
+        try:
+            offset = _copy_loop(
+                lambda pos, n: os.copy_file_range(
+                    src_fd, dst_fd, n, offset_src=pos, offset_dst=pos
+                ),
+                offset,
+                end,
+            )
+        except _Unsupported as e:
+            offset = e.offset
+        else:
+            if not positional:
+                os.lseek(dst_fd, offset, os.SEEK_SET)
+            return
+    if not positional:
+        os.lseek(dst_fd, offset, os.SEEK_SET)
+        if hasattr(os, "sendfile"):
+            try:
+                _copy_loop(
+                    lambda pos, n: os.sendfile(dst_fd, src_fd, pos, n), offset, end
+                )
+                return
+            except _Unsupported as e:
+                offset = e.offset
+                os.lseek(dst_fd, offset, os.SEEK_SET)
+
+    def read_write(pos, n):
+        data = os.pread(src_fd, min(n, _COPY_BUFSIZE), pos)
+        view = memoryview(data)
+        while view:
+            if positional:
+                written = os.pwrite(dst_fd, view, pos + len(data) - len(view))
+            else:
+                written = os.write(dst_fd, view)
+            view = view[written:]
+        return len(data)
+
+    _copy_loop(read_write, offset, end)
+
+
+class _Unsupported(Exception):
+    """A copy method isn't supported, offset is where it stopped."""
+
+    def __init__(self, offset):
+        self.offset = offset
+
+
+def _copy_loop(copy, offset, end):
+    """Call copy(offset, n) until end or EOF, return the final offset."""
+    while offset < end:
+        try:
+            copied = copy(offset, min(end - offset, 1 << 30))
+        except OSError as e:
+            if e.errno in _COPY_UNSUPPORTED:
+                raise _Unsupported(offset)
+            raise
+        if copied == 0:
+            break
+        offset += copied
+    return offset
+
+
+def _is_read_only(mode):
+    return "w" not in mode and "a" not in mode and "x" not in mode and "+" not in mode
+
+
+def _makedirs(dir_):
+    """os.makedirs(dir_, exist_ok=True), skipped for known directories."""
+    if not dir_ or dir_ in _KNOWN_DIRS:
+        return
+    os.makedirs(dir_, exist_ok=True)
+    with _KNOWN_DIRS_LOCK:
+        _KNOWN_DIRS[dir_] = None
+        while len(_KNOWN_DIRS) > _KNOWN_DIRS_MAXSIZE:
+            # forget the oldest
+            del _KNOWN_DIRS[next(iter(_KNOWN_DIRS))]
+
+
+def _forget_dirs(paths):
+    """Forget known directories equal to or below any of paths.
+
+    Returns True if any directory was forgotten.
+    """
+    paths = {os.path.abspath(p) for p in paths}
+    forgotten = False
+    with _KNOWN_DIRS_LOCK:
+        for dir_ in list(_KNOWN_DIRS):
+            parent = os.path.abspath(dir_)
+            while True:
+                if parent in paths:
+                    del _KNOWN_DIRS[dir_]
+                    forgotten = True
+                    break
+                parent, child = os.path.dirname(parent), parent
+                if parent == child:
+                    break
+    return forgotten
+
+
+def _reset_known_dirs_after_fork():
+    global _KNOWN_DIRS_LOCK
+    _KNOWN_DIRS_LOCK = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_known_dirs_after_fork)
+
+
+def _stat_info(path, st, islink=False):
+    if stat.S_ISDIR(st.st_mode):
+        type_ = "directory"
+    elif stat.S_ISREG(st.st_mode):
+        type_ = "file"
+    else:
+        type_ = "other"
+    return {
+        "name": path,
+        "size": st.st_size,
+        "type": type_,
+        "mtime": st.st_mtime,
+        "ino": st.st_ino,
+        "islink": islink,
+        "LastModified": datetime.datetime.fromtimestamp(st.st_mtime, pytz.UTC),
+    }
+
+
+def _entry_info(entry):
+    """Info dict of an os.DirEntry, reusing its cached stat result."""
+    try:
+        st = entry.stat()
+    except FileNotFoundError:
+        st = entry.stat(follow_symlinks=False)
+    return _stat_info(entry.path, st, entry.is_symlink())
+
+
+def _scandir_entries(path, maxdepth=None):
+    """Yield os.DirEntry objects of all files below path."""
+    stack = [(path, 1)]
+    while stack:
+        dir_, depth = stack.pop()
+        try:
+            it = os.scandir(dir_)
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        subdirs = []
+        with it:
+            for entry in it:
+                if entry.is_dir():
+                    # like os.walk, don't follow symlinks to directories
+                    if not entry.is_symlink() and (
+                        maxdepth is None or depth < maxdepth
+                    ):
+                        subdirs.append((entry.path, depth + 1))
+                else:
+                    yield entry
+        # reversed, so directories are visited in listing order
+        stack.extend(reversed(subdirs))
+
+
+def _unlink_all(paths):
+    errors = {}
+    for path in paths:
+        try:
+            os.unlink(path)
+        except OSError as e:
+            errors[path] = e
+    return errors
+
+
 FILESYSTEMS[""] = LocalFileSystem
 FILESYSTEMS["file"] = LocalFileSystem
@@ -1,7 +1,101 @@
+from bisect import bisect_left, insort
+
 from fsspec.implementations import memory as memfs
 
-from drfs.filesystems.base import FILESYSTEMS, FileSystemBase
-from drfs.filesystems.util import allow_pathlib, maybe_remove_scheme
+from drfs.filesystems.base import FILESYSTEMS, BatchError, FileSystemBase
+from drfs.filesystems.util import (
+    allow_pathlib,
+    is_batch,
+    maybe_remove_scheme,
+    return_pathlib,
+    return_schemes,
+)
+from drfs.util import remove_scheme
+
+
+class _IndexedStore(dict):
+    """Dict which keeps a sorted list of its keys for fast prefix lookups.
+
+    It replaces the global store of fsspec's MemoryFileSystem so that the index
+    is updated on every write and delete, no matter who does it.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._keys = sorted(self)
+
+    def __setitem__(self, key, value):
+        if key not in self:
+            insort(self._keys, key)
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        del self._keys[bisect_left(self._keys, key)]
+
+    def pop(self, key, *default):
+        if key in self:
+            del self._keys[bisect_left(self._keys, key)]
+        return super().pop(key, *default)
+
+    def popitem(self):
+        key, value = super().popitem()
+        del self._keys[bisect_left(self._keys, key)]
+        return key, value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def clear(self):
+        super().clear()
+        self._keys = []
+
+    def _prefix_range(self, prefix):
+        lo = hi = bisect_left(self._keys, prefix)
+        while hi < len(self._keys) and self._keys[hi].startswith(prefix):
+            hi += 1
+        return lo, hi
+
+    def has_prefix(self, prefix):
+        i = bisect_left(self._keys, prefix)
+        return i < len(self._keys) and self._keys[i].startswith(prefix)
+
+    def iter_prefix(self, prefix):
+        lo, hi = self._prefix_range(prefix)
+        return iter(self._keys[lo:hi])
+
+    def iter_children(self, prefix):
+        """Yield (key, is_dir) for the direct children of prefix.
+
+        Subdirectories are skipped with a single bisect, so this takes time
+        proportional to the number of children and not to the size of the tree.
+        """
+        keys = self._keys
+        i = bisect_left(keys, prefix)
+        while i < len(keys) and keys[i].startswith(prefix):
+            child, sep, _ = keys[i][len(prefix) :].partition("/")
+            if sep:
+                yield prefix + child, True
+                # "0" is the character sorting right after "/"
+                i = bisect_left(keys, prefix + child + "0", i)
+            else:
+                yield keys[i], False
+                i += 1
+
+    def pop_prefix(self, prefix):
+        """Remove all keys starting with prefix and return them."""
+        lo, hi = self._prefix_range(prefix)
+        removed = self._keys[lo:hi]
+        for key in removed:
+            super().__delitem__(key)
+        del self._keys[lo:hi]
+        return removed
 
 
 class MemoryFileSystem(FileSystemBase):
@@ -10,6 +104,21 @@ class MemoryFileSystem(FileSystemBase):
     is_remote = True
     supports_scheme = False
 
+    @property
+    def _store(self):
+        store = self.fs.store
+        if not isinstance(store, _IndexedStore):
+            # store is global, index it once for all instances
+            store = _IndexedStore(store)
+            type(self.fs).store = store
+        return store
+
+    def _norm(self, path):
+        return self.fs._strip_protocol(path).rstrip("/")
+
+    def _prefix(self, path):
+        return path + "/" if path else self.fs.root_marker
+
     @allow_pathlib
     def touch(self, *args, **kwargs):
         return self.fs.touch(*args, **kwargs)
@@ -25,42 +134,116 @@ class MemoryFileSystem(FileSystemBase):
     @allow_pathlib
     @maybe_remove_scheme
     def exists(self, path):
-        if self.fs.exists(path):
-            return True
-        elif path in self.fs.pseudo_dirs:
+        store = self._store
+        path = self._norm(path)
+        if path in store or path in self.fs.pseudo_dirs:
             return True
-        else:
-            for k in self.fs.store.keys():
-                if k.startswith(path):
-                    return True
-        return False
+        if not path:
+            return bool(store) or bool(self.fs.pseudo_dirs)
+        return store.has_prefix(self._prefix(path))
 
+    @return_pathlib
+    @return_schemes
     @allow_pathlib
     @maybe_remove_scheme
+    def ls(self, path, detail=False, **kwargs):
+        return self._ls(path, detail=detail)
+
+    def _ls(self, path, detail=False):
+        store = self._store
+        path = self._norm(path)
+        out = []
+        if path in store:
+            out.append(self._file_info(path))
+        seen = set()
+        for key, is_dir in store.iter_children(self._prefix(path)):
+            if is_dir:
+                seen.add(key)
+                out.append({"name": key + "/", "size": 0, "type": "directory"})
+            else:
+                out.append(self._file_info(key))
+        for dir_ in self.fs.pseudo_dirs:
+            dir_ = dir_.rstrip("/")
+            if dir_ not in seen and self.fs._parent(dir_).rstrip("/") == path:
+                out.append({"name": dir_ + "/", "size": 0, "type": "directory"})
+        if detail:
+            return out
+        return sorted(f["name"] for f in out)
+
+    def _file_info(self, key):
+        f = self._store[key]
+        return {
+            "name": key,
+            "size": f.getbuffer().nbytes,
+            "type": "file",
+            "created": f.created,
+        }
+
     def rm(self, path, recursive=False):
+        """Remove a path or a list of paths.
+
+        When a list is given all paths are processed and failures are raised
+        together as a BatchError at the end.
+        """
+        if is_batch(path):
+            return self._rm_many(path, recursive)
+        return self._rm(path, recursive=recursive)
+
+    def remove(self, path, recursive=False):
+        return self.rm(path, recursive=recursive)
+
+    @allow_pathlib
+    @maybe_remove_scheme
+    def _rm(self, path, recursive=False):
         if recursive:
-            self._recursive_rm(path)
+            if not self._recursive_rm(path):
+                raise FileNotFoundError(path)
         else:
             self.fs.rm(path)
 
-    def _recursive_rm(self, path):
-        for res in self.fs.ls(path, detail=True):
-            if res["type"] == "directory":
-                self._recursive_rm(res["name"])
-            else:
-                self.fs.rm(res["name"])
+    def exists_many(self, paths, max_workers=None):
+        """Check if many paths exist, sequentially as it's only dict lookups."""
+        return [self.exists(p) for p in paths]
 
-    def put(self, filename, path, **kwargs):
-        from drfs.path import asstr
+    def cat_many(self, paths, max_workers=None):
+        return self._fsspec_cat_many(paths)
 
-        filename, path = asstr(filename), asstr(path)
-        return self.fs.put(filename, path, **kwargs)
+    def remove_many(self, paths, recursive=False, max_workers=None):
+        paths = list(paths)
+        results = [None] * len(paths)
+        try:
+            self.rm(paths, recursive=recursive)
+        except BatchError as e:
+            raise BatchError(e.errors, results) from None
+        return results
 
-    def get(self, path, filename, **kwargs):
-        from drfs.path import asstr
+    def _rm_many(self, paths, recursive):
+        errors = {}
+        for path in paths:
+            try:
+                if recursive:
+                    if not self._recursive_rm(remove_scheme(str(path), raise_=False)):
+                        raise FileNotFoundError(path)
+                else:
+                    self._rm(path)
+            except Exception as e:
+                errors[str(path)] = e
+        if errors:
+            raise BatchError(errors)
 
-        path, filename = asstr(path), asstr(filename)
-        return self.fs.get(path, filename, **kwargs)
+    def _recursive_rm(self, path):
+        """Remove path and everything below it, return number of removed items."""
+        store = self._store
+        path = self._norm(path)
+        prefix = self._prefix(path)
+        removed = int(store.pop(path, None) is not None)
+        removed += len(store.pop_prefix(prefix))
+        pseudo_dirs = self.fs.pseudo_dirs
+        n_dirs = len(pseudo_dirs)
+        pseudo_dirs[:] = [
+            d for d in pseudo_dirs if d != path and not d.startswith(prefix)
+        ]
+        return removed + n_dirs - len(pseudo_dirs)
 
 
 FILESYSTEMS["memory"] = MemoryFileSystem
@@ -1,7 +1,38 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 import s3fs
+from botocore.exceptions import BotoCoreError, ClientError
+from s3fs.errors import translate_boto_error
+
+from drfs.filesystems.base import FILESYSTEMS, BatchError, FileSystemBase
+from drfs.filesystems.cache import invalidates_caches
+from drfs.filesystems.util import (
+    allow_pathlib,
+    atomic_local_file,
+    gather,
+    is_transient,
+    retry,
+    transfer_options,
+)
+
+# S3 limits for multipart uploads.
+MIN_PART_SIZE = 5 * 1024 * 1024
+MAX_PARTS = 10000
+# Objects bigger than this can't be copied with a single CopyObject request.
+MAX_COPY_SIZE = 5 * 1024 * 1024 * 1024
 
-from drfs.filesystems.base import FILESYSTEMS, FileSystemBase
-from drfs.filesystems.util import allow_pathlib
+# Maximum number of keys in a DeleteObjects request.
+_DELETE_BATCH_SIZE = 1000
+
+_RETRYABLE_CODES = {
+    "InternalError",
+    "RequestTimeout",
+    "ServiceUnavailable",
+    "SlowDown",
+    "Throttling",
+    "ThrottlingException",
+}
 
 
 class S3FileSystem(FileSystemBase):
@@ -9,6 +40,7 @@ class S3FileSystem(FileSystemBase):
     scheme = "s3"
     is_remote = True
 
+    @invalidates_caches
     @allow_pathlib
     def touch(self, *args, **kwargs):
         return self.fs.touch(*args, **kwargs)
@@ -19,20 +51,279 @@ class S3FileSystem(FileSystemBase):
     def rmdir(self, path, **kwargs):
         pass
 
+    @invalidates_caches
     def rm(self, path, recursive=False, **kwargs):
         return self.fs.rm(path, recursive=recursive, **kwargs)
 
-    def put(self, filename, path, **kwargs):
+    def remove_many(self, paths, recursive=False, max_workers=None):
+        """Remove many keys with one DeleteObjects request per 1000 keys.
+
+        DeleteObjects succeeds for missing keys, so the requested keys are
+        looked up with HEAD requests on `max_workers` threads first, to raise
+        FileNotFoundError like `remove`. Per-key errors of the response are
+        raised together as a BatchError.
+        """
         from drfs.path import asstr
 
-        filename, path = asstr(filename), asstr(path)
-        return self.fs.put(filename, path, **kwargs)
+        if recursive:
+            return super().remove_many(paths, recursive, max_workers)
+        paths = [asstr(p) for p in paths]
+        self.invalidate_caches(*paths)
+        errors = {}
+        by_bucket = {}
+        head_errors = self._head_errors(paths, max_workers)
+        for path in paths:
+            bucket, key = self.fs.split_path(path)[:2]
+            if (bucket, key) in head_errors:
+                errors[path] = head_errors[bucket, key] or FileNotFoundError(path)
+            else:
+                by_bucket.setdefault(bucket, {}).setdefault(key, []).append(path)
+        for bucket, keys in by_bucket.items():
+            keys = list(keys.items())
+            for i in range(0, len(keys), _DELETE_BATCH_SIZE):
+                batch = dict(keys[i : i + _DELETE_BATCH_SIZE])
+                try:
+                    res = self.fs.s3.delete_objects(
+                        Bucket=bucket,
+                        Delete={"Objects": [{"Key": key} for key in batch]},
+                    )
+                except ClientError as e:
+                    error = e.response.get("Error", {})
+                    res = {"Errors": [dict(error, Key=key) for key in batch]}
+                for error in res.get("Errors", []):
+                    exc = translate_boto_error(
+                        ClientError({"Error": error}, "DeleteObjects")
+                    )
+                    for path in batch.get(error["Key"], []):
+                        errors[path] = exc
+        for path in paths:
+            self.fs.invalidate_cache(path)
+        results = [None] * len(paths)
+        if errors:
+            raise BatchError(errors, results)
+        return results
+
+    def _head_errors(self, paths, max_workers):
+        """Look up the keys of paths, return {(bucket, key): error} of failed ones.
+
+        The error is None for missing keys.
+        """
+
+        def head(bucket_key):
+            bucket, key = bucket_key
+            try:
+                self.fs.s3.head_object(Bucket=bucket, Key=key)
+            except ClientError as e:
+                if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+                    return bucket_key, None
+                return bucket_key, translate_boto_error(e)
+            except BotoCoreError as e:
+                return bucket_key, e
+
+        keys = {tuple(self.fs.split_path(p)[:2]) for p in paths}
+        opts = transfer_options(max_workers)
+        with ThreadPoolExecutor(opts.max_workers) as pool:
+            return dict(filter(None, pool.map(head, keys)))
+
+    def _put_file(self, filename, path, opts, pool, **kwargs):
+        """Upload a file, in parts if it's bigger than part_size.
+
+        Parts are read from disk when they are sent, so at most max_workers
+        parts are in memory. kwargs are passed to PutObject and
+        CreateMultipartUpload, e.g. ContentType.
+        """
+        try:
+            _Transfer(self.fs, pool, opts.part_size, opts.retries).upload(
+                filename, path, **kwargs
+            )
+        finally:
+            self.fs.invalidate_cache(path)
+
+    def _get_file(self, path, filename, opts, pool):
+        """Download a file as byte ranges, each written to its place in the file."""
+        _Transfer(self.fs, pool, opts.part_size, opts.retries).download(path, filename)
+
+    def _copy_file(self, src, dst, **kwargs):
+        """Copy an object server side, in parts if it's bigger than 5 GB.
+
+        kwargs are passed to CopyObject and CreateMultipartUpload.
+        """
+        opts = transfer_options()
+        with ThreadPoolExecutor(opts.max_workers) as pool:
+            _Transfer(self.fs, pool, opts.part_size, opts.retries).copy(
+                src, dst, **kwargs
+            )
+        self.fs.invalidate_cache(dst)
+
+    def _move_file(self, src, dst):
+        self._copy_file(src, dst)
+        self.fs.rm(src)
+
+    def _list_files(self, path):
+        return ["s3://" + key for key in self.fs.find(self.fs._strip_protocol(path))]
+
+
+class _Transfer:
+    """Multipart uploads and copies, ranged downloads with a shared pool for parts."""
+
+    def __init__(self, fs, pool, part_size, retries):
+        self.fs = fs
+        self.pool = pool
+        self.part_size = part_size
+        self.retries = retries
+
+    def _call(self, method, **kwargs):
+        return retry(
+            lambda: getattr(self.fs.s3, method)(**kwargs), self.retries, _retryable
+        )
+
+    def _part_size(self, size):
+        # S3 allows at most MAX_PARTS parts
+        return max(self.part_size, MIN_PART_SIZE, -(-size // MAX_PARTS))
+
+    def upload(self, filename, path, **kwargs):
+        bucket, key = self.fs.split_path(path)[:2]
+        size = os.path.getsize(filename)
+        if size <= self.part_size:
+            with open(filename, "rb") as f:
+                data = f.read()
+            self._call("put_object", Bucket=bucket, Key=key, Body=data, **kwargs)
+            return
+        part_size = self._part_size(size)
+        self._multipart(
+            bucket,
+            key,
+            kwargs,
+            [
+                (self._upload_part, filename, offset, part_size)
+                for offset in range(0, size, part_size)
+            ],
+        )
+
+    def _multipart(self, bucket, key, kwargs, parts):
+        """Run a multipart upload, parts are (func, *args) tuples.
+
+        Each func is called with (bucket, key, upload_id, part_number, *args) on
+        the pool and returns the part's {"PartNumber", "ETag"}.
+        """
+        upload_id = self._call(
+            "create_multipart_upload", Bucket=bucket, Key=key, **kwargs
+        )["UploadId"]
+        try:
+            results = gather(
+                self.pool.submit(func, bucket, key, upload_id, i + 1, *args)
+                for i, (func, *args) in enumerate(parts)
+            )
+            self._call(
+                "complete_multipart_upload",
+                Bucket=bucket,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": results},
+            )
+        except BaseException:
+            self.fs.s3.abort_multipart_upload(
+                Bucket=bucket, Key=key, UploadId=upload_id
+            )
+            raise
+
+    def _upload_part(self, bucket, key, upload_id, number, filename, offset, size):
+        with open(filename, "rb") as f:
+            f.seek(offset)
+            data = f.read(size)
+        res = self._call(
+            "upload_part",
+            Bucket=bucket,
+            Key=key,
+            UploadId=upload_id,
+            PartNumber=number,
+            Body=data,
+        )
+        return {"PartNumber": number, "ETag": res["ETag"]}
+
+    def copy(self, src, dst, **kwargs):
+        src_bucket, src_key = self.fs.split_path(src)[:2]
+        bucket, key = self.fs.split_path(dst)[:2]
+        source = {"Bucket": src_bucket, "Key": src_key}
+        head = self._call("head_object", **source)
+        size = head["ContentLength"]
+        if size <= MAX_COPY_SIZE:
+            self._call(
+                "copy_object", CopySource=source, Bucket=bucket, Key=key, **kwargs
+            )
+            return
+        # unlike CopyObject, multipart uploads don't take over the metadata
+        if head.get("ContentType"):
+            kwargs.setdefault("ContentType", head["ContentType"])
+        kwargs.setdefault("Metadata", head.get("Metadata", {}))
+        part_size = min(self._part_size(size), MAX_COPY_SIZE)
+        self._multipart(
+            bucket,
+            key,
+            kwargs,
+            [
+                (self._copy_part, source, head["ETag"], offset, end - 1)
+                for offset, end in _ranges(size, part_size)
+            ],
+        )
+
+    def _copy_part(self, bucket, key, upload_id, number, source, etag, first, last):
+        res = self._call(
+            "upload_part_copy",
+            Bucket=bucket,
+            Key=key,
+            UploadId=upload_id,
+            PartNumber=number,
+            CopySource=source,
+            CopySourceRange=f"bytes={first}-{last}",
+            # don't mix parts of different versions
+            CopySourceIfMatch=etag,
+        )
+        return {"PartNumber": number, "ETag": res["CopyPartResult"]["ETag"]}
+
+    def download(self, path, filename):
+        bucket, key = self.fs.split_path(path)[:2]
+        head = self._call("head_object", Bucket=bucket, Key=key)
+        size, etag = head["ContentLength"], head["ETag"]
+        part_size = self.part_size if size > self.part_size else size or 1
+        with atomic_local_file(filename, size) as tmp:
+            gather(
+                self.pool.submit(
+                    self._download_part, bucket, key, etag, tmp, offset, part_size
+                )
+                for offset in range(0, size, part_size)
+            )
+
+    def _download_part(self, bucket, key, etag, filename, offset, size):
+        def download():
+            res = self.fs.s3.get_object(
+                Bucket=bucket,
+                Key=key,
+                Range=f"bytes={offset}-{offset + size - 1}",
+                IfMatch=etag,
+            )
+            # each part has its own handle, so they can write concurrently
+            with open(filename, "r+b") as f:
+                f.seek(offset)
+                for chunk in iter(lambda: res["Body"].read(1024 * 1024), b""):
+                    f.write(chunk)
+
+        retry(download, self.retries, _retryable)
+
+
+def _ranges(size, part_size):
+    """(start, end) of the parts of an object."""
+    return [
+        (offset, min(offset + part_size, size)) for offset in range(0, size, part_size)
+    ]
 
-    def get(self, path, filename, **kwargs):
-        from drfs.path import asstr
 
-        path, filename = asstr(path), asstr(filename)
-        return self.fs.get(path, filename, **kwargs)
+def _retryable(e):
+    if isinstance(e, ClientError):
+        error = e.response.get("Error", {})
+        status = e.response.get("ResponseMetadata", {}).get("HTTPStatusCode", 0)
+        return status >= 500 or error.get("Code") in _RETRYABLE_CODES
+    return isinstance(e, BotoCoreError) or is_transient(e)
 
 
 FILESYSTEMS["s3"] = S3FileSystem
@@ -1,12 +1,26 @@
+import fnmatch
+import mmap
+import os
+import threading
+import time
 import urllib.parse
-from functools import partial, wraps
+import uuid
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+from functools import wraps
 from pathlib import Path
 
+import confuse
+
 from drfs import config
-from drfs.util import prepend_scheme, remove_scheme
+from drfs.util import prepend_scheme, prepend_schemes, remove_scheme
+
+
+_FS_CACHE = OrderedDict()
+_FS_CACHE_LOCK = threading.RLock()
 
 
-def get_fs(path, opts=None, rtype="instance"):
+def get_fs(path, opts=None, rtype="instance", use_cache=True):
     """Helper to infer filesystem correctly.
 
     Gets filesystem options from settings and updates them with given `opts`.
@@ -19,6 +33,9 @@ def get_fs(path, opts=None, rtype="instance"):
         Kwargs that will be passed to inferred filesystem instance.
     rtype: str
         Either 'instance' (default) or 'class'.
+    use_cache: bool
+        If True (default) instances are shared between calls with the same
+        scheme and options. See `clear_fs_cache`.
     """
     from drfs.filesystems import FILESYSTEMS
 
@@ -42,7 +59,87 @@ def get_fs(path, opts=None, rtype="instance"):
     if opts is not None:
         opts_.update(opts)
     opts_ = _fix_opts_abfs(cls, path, opts_)
-    return cls(**opts_)
+    if not use_cache:
+        return cls(**opts_)
+    return get_fs_instance(protocol, opts_)
+
+
+def get_fs_instance(scheme, opts):
+    """Get a shared filesystem instance for scheme created with exactly `opts`.
+
+    Unlike `get_fs` no options from config are merged in. Instances are cached,
+    so all callers asking for the same scheme and options share one instance.
+    """
+    from drfs.filesystems import FILESYSTEMS
+
+    cls = FILESYSTEMS[scheme]
+    try:
+        key = (cls, scheme, _freeze(opts))
+        hash(key)
+    except TypeError:
+        # some option can't be used as a key, don't cache this instance
+        return cls(**opts)
+    with _FS_CACHE_LOCK:
+        try:
+            fs = _FS_CACHE[key]
+        except KeyError:
+            pass
+        else:
+            _FS_CACHE.move_to_end(key)
+            return fs
+    # creating may authenticate over the network, don't block other callers
+    new_fs = cls(**opts)
+    maxsize = config["fs_cache_size"].get(int)
+    with _FS_CACHE_LOCK:
+        # another thread may have created one meanwhile, keep using that one
+        fs = _FS_CACHE.setdefault(key, new_fs)
+        _FS_CACHE.move_to_end(key)
+        while len(_FS_CACHE) > max(maxsize, 0):
+            _FS_CACHE.popitem(last=False)
+        return fs
+
+
+def clear_fs_cache(path=None):
+    """Drop cached filesystem instances.
+
+    Parameters
+    ----------
+    path: str
+        If given only instances for the scheme of this path are dropped,
+        otherwise the whole cache is cleared.
+    """
+    with _FS_CACHE_LOCK:
+        if path is None:
+            _FS_CACHE.clear()
+            return
+        try:
+            protocol = path.scheme
+        except AttributeError:
+            protocol = _get_protocol(path)
+        for key in [k for k in _FS_CACHE if k[1] == protocol]:
+            del _FS_CACHE[key]
+
+
+def _reset_fs_cache_after_fork():
+    # Connections and locks must not be shared with the parent process.
+    global _FS_CACHE_LOCK
+    _FS_CACHE_LOCK = threading.RLock()
+    _FS_CACHE.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_fs_cache_after_fork)
+
+
+def _freeze(obj):
+    """Turn (nested) options into a hashable and order independent key."""
+    if isinstance(obj, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in obj.items()))
+    if isinstance(obj, (list, tuple)):
+        return tuple(_freeze(v) for v in obj)
+    if isinstance(obj, set):
+        return frozenset(_freeze(v) for v in obj)
+    return obj
 
 
 def _get_protocol(path):
@@ -70,6 +167,232 @@ def _fix_opts_abfs(cls, path, opts: dict):
     return opts
 
 
+def is_batch(path):
+    """Return True if path is a collection of paths rather than a single one."""
+    return isinstance(path, (list, tuple, set))
+
+
+def io_profile_options(path, profile=None, default=None):
+    """Options for opening path for reading, from the matching I/O profile.
+
+    Profiles are defined in the `io_profiles` config key; each one is a dict of
+    options for the filesystem's open, e.g. block_size and cache_type. The
+    `io_profile_rules` config key is a list of `{pattern: ..., profile: ...}`,
+    the first rule whose (fnmatch) pattern matches path is used.
+
+    Parameters
+    ----------
+    path: str
+        full path including the scheme.
+    profile: str or dict
+        profile name or options to use regardless of the rules, False for none.
+    default: str or dict
+        profile used when no rule matches.
+
+    Returns
+    -------
+    options: dict
+    """
+    if profile is None:
+        for rule in config["io_profile_rules"].get(list):
+            if fnmatch.fnmatchcase(path, rule["pattern"]):
+                profile = rule["profile"]
+                break
+        else:
+            profile = default
+    if not profile:
+        return {}
+    if isinstance(profile, dict):
+        return dict(profile)
+    try:
+        return config["io_profiles"][profile].get(dict).copy()
+    except confuse.NotFoundError:
+        raise ValueError(f"Unknown I/O profile {profile!r}")
+
+
+def retry(func, retries=3, retryable=lambda e: True, backoff=0.1):
+    """Call func(), retrying up to `retries` times on retryable exceptions.
+
+    Waits backoff, 2 * backoff, 4 * backoff, ... seconds (at most 10) between
+    attempts.
+    """
+    for attempt in range(retries + 1):
+        try:
+            return func()
+        except Exception as e:
+            if attempt == retries or not retryable(e):
+                raise
+        time.sleep(min(backoff * (1 << attempt), 10))
+
+
+TransferOptions = namedtuple("TransferOptions", ["max_workers", "part_size", "retries"])
+
+
+def transfer_options(max_workers=None, part_size=None, retries=None):
+    """Fill in defaults for put/get from the `transfer` config key."""
+    opts = config["transfer"]
+    return TransferOptions(
+        opts["max_workers"].get(int) if max_workers is None else max_workers,
+        opts["part_size"].get(int) if part_size is None else part_size,
+        opts["retries"].get(int) if retries is None else retries,
+    )
+
+
+def is_transient(e):
+    """True for errors worth retrying, like dropped connections and timeouts."""
+    permanent = (
+        FileExistsError,
+        FileNotFoundError,
+        IsADirectoryError,
+        NotADirectoryError,
+        PermissionError,
+    )
+    return isinstance(e, OSError) and not isinstance(e, permanent)
+
+
+def gather(futures):
+    """Return results of futures in order, cancel the rest if one fails."""
+    futures = list(futures)
+    try:
+        return [f.result() for f in futures]
+    except BaseException:
+        for f in futures:
+            f.cancel()
+        raise
+
+
+def local_files(root):
+    """Yield (path, relative path with "/" separators) of files below root."""
+    for dir_, _, files in os.walk(root):
+        for name in files:
+            path = os.path.join(dir_, name)
+            yield path, os.path.relpath(path, root).replace(os.sep, "/")
+
+
+def temp_name(filename):
+    """Unique name for a hidden temporary file next to filename."""
+    dir_, name = os.path.split(os.path.abspath(filename))
+    return os.path.join(dir_, f".{name}.{uuid.uuid4().hex}.part")
+
+
+@contextmanager
+def atomic_local_file(filename, size=None):
+    """Yield a new temporary path next to filename, renamed to it on success.
+
+    The temporary file is created with `size` bytes if given, so parts of it
+    can be written concurrently. On errors it's removed.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
+    tmp = temp_name(filename)
+    try:
+        with open(tmp, "xb") as f:
+            if size:
+                f.truncate(size)
+        yield tmp
+        os.replace(tmp, filename)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def on_close(f, callback):
+    """Make f call callback once it's closed, return f.
+
+    Files of fsspec filesystems are patched in place, so they keep their type.
+    Files which don't allow that are returned without the hook.
+    """
+    close = f.close
+
+    def close_and_call():
+        closed = f.closed
+        try:
+            close()
+        finally:
+            if not closed:
+                callback()
+
+    try:
+        f.close = close_and_call
+    except AttributeError:
+        pass
+    return f
+
+
+class AtomicFile:
+    """File object writing to a local temporary file, committed on close.
+
+    `commit(tmp)` is called on close to put the data in place. If the with
+    block the file is used in raises, `discard` is called or the file is
+    garbage collected without being closed, the temporary file is removed and
+    nothing is committed.
+    """
+
+    def __init__(self, tmp, mode, commit, *args, **kwargs):
+        if not set(mode) & set("wx") or "+" in mode:
+            raise ValueError(f"Atomic writes need mode 'w' or 'x', got {mode!r}")
+        self._tmp = tmp
+        self._commit = commit
+        self._f = open(tmp, mode.replace("x", "w"), *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._f, name)
+
+    def __iter__(self):
+        return iter(self._f)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+    def __del__(self):
+        f = self.__dict__.get("_f")
+        if f is not None and not f.closed:
+            self.discard()
+
+    def close(self):
+        """Close the file and commit its contents."""
+        if self._f.closed:
+            return
+        self._f.close()
+        try:
+            self._commit(self._tmp)
+        finally:
+            self._remove_tmp()
+
+    def discard(self):
+        """Close the file without committing it."""
+        self._f.close()
+        self._remove_tmp()
+
+    def _remove_tmp(self):
+        try:
+            os.unlink(self._tmp)
+        except FileNotFoundError:
+            pass
+
+
+def map_file(path):
+    """Map a local file read-only into memory.
+
+    Returns
+    -------
+    buffer: mmap.mmap or memoryview
+        a read-only mmap, or an empty memoryview for empty files which can't be
+        mapped. Both support the buffer protocol and can be used as context
+        managers.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return memoryview(b"")
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
 def allow_pathlib(func):
     """Allow methods to receive pathlib.Path objects.
 
@@ -97,28 +420,55 @@ def allow_pathlib(func):
 
 
 def return_pathlib(func):
+    """Convert returned path(s) to DRPath objects.
+
+    Decorated methods accept an additional `as_paths` keyword, if it's False
+    the results are returned as plain strings. If it's not given, the `as_paths`
+    attribute of the filesystem is used.
+    """
+
     @wraps(func)
-    def wrapper(self, path, *args, **kwargs):
+    def wrapper(self, path, *args, as_paths=None, **kwargs):
         from drfs.path import aspath
 
         res = func(self, path, *args, **kwargs)
-        as_path = aspath(res)
-        return as_path
+        if not _as_paths(self, as_paths):
+            return res
+        return aspath(res)
+
+    return wrapper
+
+
+def iter_pathlib(func):
+    """Like return_pathlib, but for generators: items are converted lazily."""
+
+    @wraps(func)
+    def wrapper(self, path, *args, as_paths=None, **kwargs):
+        from drfs.path import iter_paths
+
+        res = func(self, path, *args, **kwargs)
+        if not _as_paths(self, as_paths):
+            return res
+        return iter_paths(res)
 
     return wrapper
 
 
+def _as_paths(fs, as_paths):
+    if as_paths is None:
+        return getattr(fs, "as_paths", True)
+    return as_paths
+
+
 def return_schemes(func):
     """Make sure method returns full path with scheme."""
 
     @wraps(func)
     def wrapper(self, path, *args, **kwargs):
         res = func(self, path, *args, **kwargs)
-        try:
-            res = list(map(partial(prepend_scheme, self.scheme), res))
-        except TypeError:
-            res = prepend_scheme(self.scheme, res)
-        return res
+        if isinstance(res, str):
+            return prepend_scheme(self.scheme, res)
+        return prepend_schemes(self.scheme, res)
 
     return wrapper
 
@@ -27,8 +27,17 @@ class FileTarget(FileSystemTarget):
     def fs(self):
         return get_fs(self.path, opts=self.storage_options, rtype="instance")
 
-    def open(self, *args, **kwargs):
-        return self.fs.open(self.path, *args, **kwargs)
+    def open(self, *args, atomic=None, **kwargs):
+        """Open the target's file.
+
+        Writing in mode "w" or "x" is atomic by default like with luigi's
+        LocalTarget: the file only appears once it's closed, a failing task
+        leaves nothing behind. Pass `atomic=False` to write in place.
+        """
+        if atomic is None:
+            mode = args[0] if args else kwargs.get("mode", "")
+            atomic = mode.strip("bt") in ("w", "x")
+        return self.fs.open(self.path, *args, atomic=atomic, **kwargs)
 
     def makedirs(self, *args, **kwargs):
         self.fs.makedirs(os.path.dirname(self.path), *args, **kwargs)
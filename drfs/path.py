@@ -5,7 +5,8 @@ from pathlib import Path, PurePath
 from urlpath import URL, cached_property
 
 from drfs import config
-from drfs.filesystems import FILESYSTEMS, get_fs
+from drfs.filesystems import get_fs
+from drfs.filesystems.util import get_fs_instance
 
 # Actual type of Path depends on the OS and is determined on instantiation.
 PATH_CLASS = type(Path())
@@ -41,6 +42,10 @@ class DRPathMixin:
         config_scheme_key = self.scheme if self.scheme else "file"
         return config["fs_opts"][config_scheme_key].get(dict)
 
+    def open_mmap(self, **kwargs):
+        """Map the file read-only into memory, see FileSystemBase.open_mmap."""
+        return get_fs(self).open_mmap(str(self), **kwargs)
+
     def startswith(self, *args, **kwargs):
         """Act like a string - for compatibility with s3fs.put"""
         return str(self).startswith(*args, **kwargs)
@@ -63,6 +68,10 @@ class RemotePath(URL, DRPathMixin):
     instantiation.
     """
 
+    # Paths derived by pathlib internals (e.g. `parent`) skip __new__ and _init.
+    _storage_options = None
+    _acc_real = None
+
     def __new__(cls, *args, storage_options=None, **kwargs):
         self = cls._from_parts(args, init=False)
         self._init()
@@ -77,7 +86,7 @@ class RemotePath(URL, DRPathMixin):
     def _accessor(self):
         if self._acc_real is None:
             try:
-                self._acc_real = FILESYSTEMS[self.scheme](**self.opts)
+                self._acc_real = get_fs_instance(self.scheme, self.opts)
             except KeyError:
                 raise ValueError(
                     "Scheme {} not found in available filesystems"
@@ -89,9 +98,16 @@ class RemotePath(URL, DRPathMixin):
         return self._accessor.exists(str(self))
 
     def open(self, *args, **kwargs):
-        """Return a File object dependent of remote storage used."""
+        """Return a File object dependent of remote storage used.
+
+        Pass `atomic=True` to only create the file once it's closed, see
+        FileSystemBase.open.
+        """
         return self._accessor.open(str(self), *args, **kwargs)
 
+    def open_mmap(self, **kwargs):
+        return self._accessor.open_mmap(str(self), **kwargs)
+
     def unlink(self):
         self._accessor.remove(str(self))
 
@@ -107,7 +123,7 @@ class RemotePath(URL, DRPathMixin):
             Instead of relative paths this will return absolute paths
             to the files in the directory.
         """
-        for path in self._accessor.ls(str(self)):
+        for path in self._accessor.ls(str(self), as_paths=True):
             yield path
 
     def mkdir(self, *args, **kwargs):
@@ -137,24 +153,46 @@ class RemotePath(URL, DRPathMixin):
             + self.trailing_sep
         )
 
-    def _make_child(self, args):
-        res = super()._make_child(args)
-        res._storage_options = self._storage_options
-        res._acc_real = self._acc_real
+    def _derive(self, res):
+        """Share storage options and filesystem with a path derived from self."""
+        if isinstance(res, RemotePath) and res.scheme == self.scheme:
+            res._storage_options = self._storage_options
+            res._acc_real = self._acc_real
         return res
 
+    def _make_child(self, args):
+        return self._derive(super()._make_child(args))
+
+    @property
+    def parent(self):
+        return self._derive(super().parent)
+
+    def with_name(self, name):
+        return self._derive(super().with_name(name))
+
+    def with_suffix(self, suffix):
+        return self._derive(super().with_suffix(suffix))
+
+    def format(self, *args, **kwargs):
+        return self._derive(super().format(*args, **kwargs))
+
 
 class LocalPath(PATH_CLASS, DRPathMixin):
-    pass
+    def open(self, mode="r", *args, atomic=False, **kwargs):
+        """Open the file, see pathlib.Path.open.
+
+        With `atomic=True` a file opened for writing only appears once it's
+        closed, see LocalFileSystem.open.
+        """
+        if atomic:
+            return get_fs(self).open(str(self), mode, *args, atomic=True, **kwargs)
+        return super().open(mode, *args, **kwargs)
 
 
 class DRPath:
     def __new__(cls, path, *args, **kwargs):
         if cls is DRPath:
-            if get_fs(path, rtype="class").is_remote:
-                cls = RemotePath
-            else:
-                cls = LocalPath
+            cls = _get_path_class(path)
         obj = cls(path, *args, **kwargs)
         return obj
 
@@ -175,13 +213,54 @@ def aspath(x):
     if isinstance(x, (list, tuple, set)):
         if len(x) == 0:
             return x
-        return type(x)(map(DRPath, x))  # return the same type of iterable
+        return type(x)(iter_paths(x))  # return the same type of iterable
     else:
         return DRPath(x)
 
 
+def iter_paths(items):
+    """Convert many items to paths.
+
+    Items are usually results of a listing and share the same scheme, so the
+    path class is looked up directly instead of going through DRPath.
+    """
+    for item in items:
+        if isinstance(item, DRPathMixin):
+            yield item
+        elif isinstance(item, str):
+            yield _get_path_class(item)(item)
+        elif isinstance(item, dict):
+            # info dicts of detailed listings are returned as they are
+            yield item
+        else:
+            yield DRPath(item)
+
+
+# Maps the part of a path before "://" to its path class.
+_PATH_CLASSES = {}
+_PATH_CLASSES_MAXSIZE = 64
+
+
 def _get_path_class(path):
-    if get_fs(path).is_remote:
+    if isinstance(path, PurePath):
+        path = str(path)
+    elif not isinstance(path, str):
+        return _lookup_path_class(path)
+    i = path.find("://")
+    # urlparse's scheme only depends on the text before the first ":", so equal
+    # prefixes always resolve to the same filesystem.
+    prefix = path[:i] if i >= 0 else ""
+    try:
+        return _PATH_CLASSES[prefix]
+    except KeyError:
+        cls = _lookup_path_class(path)
+        if len(_PATH_CLASSES) < _PATH_CLASSES_MAXSIZE:
+            _PATH_CLASSES[prefix] = cls
+        return cls
+
+
+def _lookup_path_class(path):
+    if get_fs(path, rtype="class").is_remote:
         return RemotePath
     else:
-        return Path
+        return LocalPath
@@ -1,6 +1,16 @@
 import pytest
 from moto import mock_s3
 
+from drfs.filesystems import clear_fs_cache
+
+
+@pytest.fixture(autouse=True)
+def fs_cache():
+    """Don't share filesystem instances between tests."""
+    clear_fs_cache()
+    yield
+    clear_fs_cache()
+
 
 @pytest.fixture()
 def s3():
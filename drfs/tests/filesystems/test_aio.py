@@ -0,0 +1,109 @@
+import asyncio
+
+from fsspec.asyn import AsyncFileSystem
+
+from drfs import agnostic
+from drfs.filesystems import AsyncFileSystemBase, get_async_fs
+from drfs.filesystems.base import FILESYSTEMS, FileSystemBase
+from drfs.filesystems.local import LocalFileSystem
+from drfs.path import LocalPath, RemotePath
+
+
+class _DictAsyncFileSystem(AsyncFileSystem):
+    cachable = False
+    data = {"bucket/file.txt": b"hello"}
+
+    async def _cat_file(self, path, start=None, end=None, **kwargs):
+        return self.data[self._strip_protocol(path)]
+
+    async def _exists(self, path, **kwargs):
+        return self._strip_protocol(path) in self.data
+
+    async def _info(self, path, **kwargs):
+        path = self._strip_protocol(path)
+        return {"name": path, "size": len(self.data[path]), "type": "file"}
+
+    async def _ls(self, path, detail=False, **kwargs):
+        return list(self.data)
+
+    async def _put_file(self, lpath, rpath, **kwargs):
+        with open(lpath, "rb") as f:
+            self.data[self._strip_protocol(rpath)] = f.read()
+
+
+class _DictFileSystem(FileSystemBase):
+    fs_cls = _DictAsyncFileSystem
+    scheme = "dict"
+    is_remote = True
+    supports_scheme = False
+
+
+def test_native_coroutines(monkeypatch):
+    monkeypatch.setitem(FILESYSTEMS, "dict", _DictFileSystem)
+    fs = AsyncFileSystemBase(_DictFileSystem())
+    # fail if anything goes through the executor
+    monkeypatch.setattr(fs, "_run", None)
+
+    async def main():
+        assert await fs.cat("dict://bucket/file.txt") == b"hello"
+        assert await fs.exists("dict://bucket/file.txt")
+        assert not await fs.exists("dict://bucket/missing.txt")
+        assert (await fs.info("dict://bucket/file.txt"))["size"] == 5
+        assert await fs.ls("dict://bucket") == [RemotePath("dict://bucket/file.txt")]
+
+    asyncio.run(main())
+
+
+def test_native_coroutines_with_caches(monkeypatch, tmpdir):
+    monkeypatch.setitem(FILESYSTEMS, "dict", _DictFileSystem)
+    monkeypatch.setattr(_DictAsyncFileSystem, "data", {"bucket/file.txt": b"hello"})
+    fs = AsyncFileSystemBase(_DictFileSystem(listings_ttl=60))
+    local = tmpdir.join("new.txt")
+    local.write_binary(b"new")
+    native = []
+
+    async def _native(name, *args, **kwargs):
+        native.append(name)
+        return await AsyncFileSystemBase._native(fs, name, *args, **kwargs)
+
+    monkeypatch.setattr(fs, "_native", _native)
+
+    async def main():
+        # listings are cached by the sync filesystem
+        assert len(await fs.ls("dict://bucket")) == 1
+        await fs.put(str(local), "dict://bucket/new.txt")
+        assert len(await fs.ls("dict://bucket")) == 2
+
+    asyncio.run(main())
+    assert native == ["_put_file"]
+
+
+def test_executor_fallback(tmpdir):
+    fs = AsyncFileSystemBase(LocalFileSystem())
+    path = tmpdir / "file.txt"
+
+    async def main():
+        f = await fs.open(path, "wb")
+        with f:
+            f.write(b"hello")
+        assert await fs.exists(path)
+        assert await fs.cat(path) == b"hello"
+        assert await fs.ls(tmpdir) == [LocalPath(path)]
+        await fs.remove(path)
+        assert not await fs.exists(path)
+
+    asyncio.run(main())
+
+
+def test_agnostic_async(tmpdir):
+    path = str(tmpdir / "file.txt")
+
+    async def main():
+        assert isinstance(await get_async_fs(path), AsyncFileSystemBase)
+        with await agnostic.aopen(path, "w") as f:
+            f.write("hello")
+        assert await agnostic.aexists(path)
+        assert await agnostic.acat(path) == b"hello"
+        assert await agnostic.aglob(str(tmpdir / "*.txt")) == [LocalPath(path)]
+
+    asyncio.run(main())
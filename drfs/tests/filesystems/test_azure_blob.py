@@ -1,5 +1,7 @@
 import pytest
 
+from drfs.path import DRPath
+
 try:
     from drfs.filesystems.azure_blob import extract_abfs_parts
 except ImportError:
@@ -11,3 +13,11 @@ def test_extract_abfs_parts():
     assert extract_abfs_parts("abfs://acc/cont/dir/file") == ("acc", "cont", "dir/file")
     with pytest.raises(ValueError, match="doesn't match abfs"):
         extract_abfs_parts("abfas://acc/cont/dir/file")
+
+
+def test_extract_abfs_parts_record():
+    parts = extract_abfs_parts("abfs://acc/cont/dir/file")
+
+    assert (parts.account, parts.container, parts.key) == ("acc", "cont", "dir/file")
+    assert extract_abfs_parts("abfs://acc/cont/dir/file") is parts
+    assert extract_abfs_parts(DRPath("abfs://acc/cont/dir/file")) is parts
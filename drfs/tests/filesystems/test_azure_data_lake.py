@@ -1,3 +1,5 @@
+import time
+
 import pytest
 from azure.datalake.store import AzureDLFileSystem
 from mock import MagicMock
@@ -22,16 +24,51 @@ def mock_azure_fs_native(monkeypatch):
     cls = MagicMock()
     cls.return_value = fs
     monkeypatch.setattr(azure_datalake, "AzureDLFileSystem", cls)
+    monkeypatch.setattr(azure_datalake.AzureDataLakeFileSystem, "fs_cls", cls)
     monkeypatch.setattr(azure_datalake.lib, "auth", lambda *args, **kwargs: "token")
 
 
 def test_custom_connect():
     fs = azure_datalake.AzureDataLakeFileSystem()
-    path = fs._connect("adl://intvanprofi/some/path.txt")
-    assert fs.fs.kwargs["store_name"] == "intvanprofi"
+    store, path = fs._connect("adl://intvanprofi/some/path.txt")
+    assert azure_datalake.AzureDLFileSystem.call_args[1]["store_name"] == "intvanprofi"
     assert not path.startswith("adl://intvanprofi")
 
 
+def test_connection_reused():
+    fs = azure_datalake.AzureDataLakeFileSystem()
+    n_calls = azure_datalake.AzureDLFileSystem.call_count
+
+    fs.exists("adl://store1/some/path.txt")
+    fs.exists("adl://store1/other/path.txt")
+    fs.exists("adl://store2/some/path.txt")
+
+    assert azure_datalake.AzureDLFileSystem.call_count == n_calls + 2
+    assert not fs.fs.connect.called
+
+
+def test_token_cached(monkeypatch):
+    calls = []
+    monkeypatch.setattr(azure_datalake, "_TOKENS", {})
+    monkeypatch.setattr(
+        azure_datalake.lib, "auth", lambda *args, **kwargs: calls.append(1) or "token"
+    )
+
+    azure_datalake.AzureDataLakeFileSystem(tenant_id="t", client_id="c")
+    azure_datalake.AzureDataLakeFileSystem(tenant_id="t", client_id="c")
+
+    assert len(calls) == 1
+
+
+def test_token_refreshed_before_expiry(monkeypatch):
+    token = MagicMock()
+    token.token = {"time": time.time() - 3590, "expires_in": 3600}
+    monkeypatch.setattr(azure_datalake, "_TOKENS", {(None, None, None): token})
+
+    assert azure_datalake.get_token() is token
+    token.refresh_token.assert_called_once_with()
+
+
 def test_ls():
     fs = azure_datalake.AzureDataLakeFileSystem()
     res = fs.ls("adl://intvanprofi/some/path/to/directory")
@@ -51,3 +88,48 @@ def test_glob():
     for p in res:
         assert p.hostname == "intvanprofi"
         assert p.scheme == "adl"
+
+
+def test_ls_as_strings():
+    fs = azure_datalake.AzureDataLakeFileSystem(as_paths=False)
+    res = fs.ls("adl://intvanprofi/some/path/to/directory")
+
+    assert res[0] == "adl://intvanprofi/folder/directory/file.txt"
+
+
+def test_walk_files():
+    fs = azure_datalake.AzureDataLakeFileSystem()
+    files = [
+        {"name": "dir/a.txt", "length": 1, "type": "FILE"},
+        {"name": "dir/sub/b.txt", "length": 2, "type": "FILE"},
+    ]
+
+    def walk(path, details=False, invalidate_cache=True):
+        return files if details else [f["name"] for f in files]
+
+    fs.fs.walk.side_effect = walk
+    fs.fs.info.return_value = files[0]
+
+    assert fs._relative_files("adl://store/dir") == [
+        ("adl://store/dir/a.txt", "a.txt"),
+        ("adl://store/dir/sub/b.txt", "sub/b.txt"),
+    ]
+    infos = fs.walk("adl://store/dir", detail=True)
+    assert [(i["name"], i["size"]) for i in infos] == [
+        ("adl://store/dir/a.txt", 1),
+        ("adl://store/dir/sub/b.txt", 2),
+    ]
+    assert fs.info("adl://store/dir/a.txt")["size"] == 1
+
+
+def test_base_options():
+    fs = azure_datalake.AzureDataLakeFileSystem(
+        info_ttl=60, listings_ttl=60, as_paths=False, store_name="store1"
+    )
+    fs.exists("adl://store2/some/path.txt")
+
+    assert fs.infos is not None and fs.listings is not None
+    assert not fs.as_paths
+    for call in azure_datalake.AzureDLFileSystem.call_args_list:
+        assert "info_ttl" not in call[1] and "as_paths" not in call[1]
+    assert azure_datalake.AzureDLFileSystem.call_args[1]["store_name"] == "store2"
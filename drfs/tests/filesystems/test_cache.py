@@ -0,0 +1,70 @@
+import time
+
+from drfs.filesystems.cache import InfoCache, ListingCache
+
+
+def test_listing_cache_ttl():
+    cache = ListingCache(ttl=0.05)
+    cache.set(("ls", "bucket/dir"), ("a",))
+
+    assert cache.get(("ls", "bucket/dir")) == ("a",)
+    time.sleep(0.06)
+    assert cache.get(("ls", "bucket/dir")) is None
+    assert cache.stats() == {"hits": 1, "misses": 1, "size": 0}
+
+
+def test_listing_cache_maxsize():
+    cache = ListingCache(ttl=60, maxsize=2)
+    for i in range(3):
+        cache.set(("ls", f"bucket/{i}"), ())
+
+    assert cache.get(("ls", "bucket/0")) is None
+    assert cache.get(("ls", "bucket/2")) == ()
+
+
+def test_listing_cache_invalidate():
+    cache = ListingCache(ttl=60)
+    keys = [
+        ("ls", "bucket/dir"),
+        ("ls", "bucket"),
+        ("walk", "bucket/dir/sub"),
+        ("glob", "bucket/dir/*.csv"),
+        ("ls", "bucket/other"),
+        ("ls", "bucket/dir2"),
+        ("glob", "*"),
+    ]
+    for key in keys:
+        cache.set(key, ())
+
+    cache.invalidate("s3://bucket/dir/")
+
+    assert [k for k in keys if cache.get(k) is not None] == [
+        ("ls", "bucket/other"),
+        ("ls", "bucket/dir2"),
+    ]
+
+
+def test_cache_invalidate_after_eviction():
+    cache = InfoCache(ttl=60, maxsize=2)
+    for name in ["bucket/a", "bucket/b", "bucket/c/d"]:
+        cache.set(name, {})
+    cache.invalidate("bucket/c")
+
+    assert cache.get("bucket/b") == {}
+    assert cache.stats()["size"] == 1
+    cache.ttl = 0
+    cache.set("bucket/e", {})
+    assert cache.get("bucket/e") is None
+    cache.invalidate("bucket")
+    assert cache.stats()["size"] == 0
+    assert cache._bases == []
+
+
+def test_info_cache():
+    cache = InfoCache(ttl=60)
+    cache.update([{"name": "bucket/dir/a", "size": 1}, "bucket/dir/b"])
+
+    assert cache.get("s3://bucket/dir/a") == {"name": "bucket/dir/a", "size": 1}
+    assert cache.get("bucket/dir/b") is None
+    cache.invalidate("bucket/dir")
+    assert cache.get("bucket/dir/a") is None
@@ -0,0 +1,28 @@
+import os
+
+from drfs.filesystems.disk_cache import DiskCache, file_version
+
+
+def test_disk_cache(tmpdir):
+    cache = DiskCache(str(tmpdir), max_size=25)
+    keys = [cache.key("s3", f"bucket/{i}", ["etag"]) for i in range(3)]
+
+    assert cache.get(keys[0]) is None
+    cache.put(keys[0], b"0" * 10)
+    cache.put(keys[1], b"1" * 10)
+    assert cache.get(keys[0]) == b"0" * 10
+    os.utime(cache.get_path(keys[1]), (0, 0))  # least recently used
+    cache.put(keys[2], b"2" * 10)
+
+    assert cache.get(keys[1]) is None
+    assert open(cache.get_path(keys[2]), "rb").read() == b"2" * 10
+    assert cache.stats() == {"hits": 3, "misses": 2, "evictions": 1, "size": 20}
+    assert not [f for f in tmpdir.visit() if f.basename.startswith(".tmp-")]
+
+    cache.clear()
+    assert cache.get(keys[0]) is None
+
+
+def test_file_version():
+    assert file_version({"name": "a", "size": 1}) is None
+    assert file_version({"size": 1, "ETag": '"abc"'}) == [1, '"abc"']
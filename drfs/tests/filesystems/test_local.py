@@ -1,10 +1,16 @@
+import errno
+import gc
+import os
+import shutil
 from datetime import datetime
 from pathlib import Path
 
 import pytest
 
+from drfs.filesystems import BatchError
+from drfs.filesystems import local
 from drfs.filesystems.local import LocalFileSystem
-from drfs.path import LocalPath
+from drfs.path import DRPath, LocalPath
 
 
 def test_local_filesystem(tmpdir):
@@ -82,3 +88,254 @@ def test_remove(tmpdir):
     fs.remove(dir1, recursive=True)
     assert not fs.exists(file1)
     assert not fs.exists(dir1)
+
+
+def test_remove_many(tmpdir):
+    fs = LocalFileSystem()
+    for i in range(5):
+        fs.touch(tmpdir / "dir1" / f"sub{i}" / "file.txt")
+    fs.touch(tmpdir / "dir2" / "file.txt")
+    fs.touch(tmpdir / "keep.txt")
+    fs.touch(tmpdir / "single.txt")
+
+    with pytest.raises(BatchError) as exc_info:
+        fs.rm(
+            [
+                tmpdir / "dir1",
+                tmpdir / "missing",
+                tmpdir / "dir2",
+                tmpdir / "single.txt",
+            ],
+            recursive=True,
+            max_workers=2,
+        )
+
+    assert list(exc_info.value.errors) == [str(tmpdir / "missing")]
+    assert isinstance(exc_info.value.errors[str(tmpdir / "missing")], FileNotFoundError)
+    assert sorted(p.name for p in fs.ls(tmpdir)) == ["keep.txt"]
+
+
+def test_remove_many_not_recursive(tmpdir):
+    fs = LocalFileSystem()
+    fs.touch(tmpdir / "dir1" / "file.txt")
+    fs.touch(tmpdir / "file.txt")
+
+    with pytest.raises(BatchError) as exc_info:
+        fs.remove([tmpdir / "dir1", tmpdir / "file.txt"])
+
+    assert list(exc_info.value.errors) == [str(tmpdir / "dir1")]
+    assert not fs.exists(tmpdir / "file.txt")
+    assert fs.exists(tmpdir / "dir1" / "file.txt")
+    with pytest.raises(BatchError) as exc_info:
+        fs.remove_many([tmpdir / "dir1", tmpdir / "file.txt"])
+    assert exc_info.value.results == [None, None]
+
+
+def test_detailed_listings(tmpdir):
+    root = Path(tmpdir)
+    (root / "sub").mkdir()
+    (root / "a.txt").write_text("abc")
+    (root / "sub" / "b.txt").write_text("b")
+    fs = LocalFileSystem()
+
+    listing = {i["name"]: i for i in fs.ls(root, detail=True)}
+    assert listing[str(root / "a.txt")]["size"] == 3
+    assert listing[str(root / "a.txt")]["type"] == "file"
+    assert listing[str(root / "sub")]["type"] == "directory"
+    info = fs.info(root / "a.txt")
+    assert info == listing[str(root / "a.txt")]
+    assert info["ino"] == (root / "a.txt").stat().st_ino
+
+    walked = fs.walk(root, detail=True)
+    assert sorted(i["name"] for i in walked) == [
+        str(root / "a.txt"),
+        str(root / "sub" / "b.txt"),
+    ]
+    assert all(isinstance(i["mtime"], float) for i in walked)
+
+
+def test_open_known_dirs(tmpdir, monkeypatch):
+    root = Path(tmpdir)
+    fs = LocalFileSystem()
+    calls = []
+    makedirs = local.os.makedirs
+    monkeypatch.setattr(
+        local.os, "makedirs", lambda *a, **kw: calls.append(a) or makedirs(*a, **kw)
+    )
+
+    for i in range(3):
+        fs.touch(root / "dir" / f"{i}.txt")
+    assert len(calls) == 1
+
+    with pytest.raises(FileNotFoundError):
+        fs.open(root / "missing" / "a.txt")
+    assert not (root / "missing").exists()
+
+    fs.remove(root / "dir", recursive=True)
+    fs.touch(root / "dir" / "0.txt")
+    assert len(calls) == 2
+
+    # removed behind our back
+    shutil.rmtree(root / "dir")
+    with fs.open(root / "dir" / "0.txt", "w") as f:
+        f.write("0")
+    assert len(calls) == 3
+
+
+def test_open_atomic(tmpdir):
+    root = Path(tmpdir)
+    path = root / "sub" / "out.txt"
+    fs = LocalFileSystem()
+
+    with fs.open(path, "w", atomic=True) as f:
+        f.write("a")
+        assert not path.exists()
+    assert path.read_text() == "a"
+    with pytest.raises(RuntimeError):
+        with DRPath(str(path)).open("wb", atomic=True) as f:
+            f.write(b"partial")
+            raise RuntimeError
+    assert path.read_text() == "a"
+    with pytest.raises(FileExistsError):
+        with fs.open(path, "x", atomic=True) as f:
+            f.write("b")
+    assert os.listdir(root / "sub") == ["out.txt"]
+    with pytest.raises(ValueError):
+        fs.open(path, "a", atomic=True)
+    with pytest.raises(ValueError):
+        fs.open(path, "r+", atomic=True)
+
+    f = fs.open(path, "w", atomic=True)
+    f.write("dropped")
+    del f
+    gc.collect()
+    assert os.listdir(root / "sub") == ["out.txt"]
+    assert path.read_text() == "a"
+
+
+@pytest.mark.parametrize("unsupported", [(), ("copy_file_range", "sendfile")])
+def test_copy_file(tmpdir, monkeypatch, unsupported):
+    def enosys(*args, **kwargs):
+        raise OSError(errno.ENOSYS, "not supported")
+
+    for name in unsupported:
+        monkeypatch.setattr(local.os, name, enosys, raising=False)
+    monkeypatch.setattr(local, "_reflink", lambda *args: False)
+    root = Path(tmpdir)
+    data = os.urandom(10_000)
+    (root / "src.bin").write_bytes(data)
+    fs = LocalFileSystem()
+
+    fs.copy(root / "src.bin", root / "dst" / "a.bin")
+    fs.copy(root / "src.bin", root / "dst" / "b.bin", chunk_size=999, max_workers=4)
+    assert (root / "dst" / "a.bin").read_bytes() == data
+    assert (root / "dst" / "b.bin").read_bytes() == data
+    with pytest.raises(shutil.SameFileError):
+        fs.copy(root / "src.bin", root / "src.bin")
+
+
+def test_move_across_devices(tmpdir, monkeypatch):
+    def exdev(*args, **kwargs):
+        raise OSError(errno.EXDEV, "cross-device link")
+
+    monkeypatch.setattr(local.os, "rename", exdev)
+    root = Path(tmpdir)
+    (root / "src" / "sub").mkdir(parents=True)
+    (root / "src" / "a.sh").write_text("a")
+    (root / "src" / "sub" / "b.txt").write_text("b")
+    os.chmod(root / "src" / "a.sh", 0o755)
+    os.utime(root / "src" / "a.sh", (1_000_000, 1_000_000))
+    fs = LocalFileSystem()
+
+    fs.move(root / "src" / "a.sh", root / "moved" / "a.sh")
+    st = os.stat(root / "moved" / "a.sh")
+    assert st.st_mode & 0o777 == 0o755
+    assert st.st_mtime == 1_000_000
+    assert not (root / "src" / "a.sh").exists()
+    fs.move(root / "src", root / "tree", recursive=True)
+    assert (root / "tree" / "sub" / "b.txt").read_text() == "b"
+    assert not (root / "src").exists()
+
+
+def test_copy_tree(tmpdir):
+    root = Path(tmpdir)
+    (root / "src" / "sub" / "empty").mkdir(parents=True)
+    (root / "src" / "a.txt").write_text("a")
+    (root / "src" / "sub" / "b.txt").write_text("b")
+    fs = LocalFileSystem()
+
+    fs.copy(root / "src", root / "dst", recursive=True, max_workers=2)
+    assert (root / "dst" / "a.txt").read_text() == "a"
+    assert (root / "dst" / "sub" / "b.txt").read_text() == "b"
+    assert (root / "dst" / "sub" / "empty").is_dir()
+
+    fs.put(root / "src", root / "put", recursive=True)
+    fs.get(root / "put" / "sub" / "b.txt", root / "got" / "b.txt")
+    assert (root / "got" / "b.txt").read_text() == "b"
+    with pytest.raises(IsADirectoryError):
+        fs.put(root / "src", root / "put2")
+
+
+def test_open_mmap(tmpdir):
+    path = Path(tmpdir) / "data.bin"
+    path.write_bytes(b"abc")
+    (Path(tmpdir) / "empty").touch()
+    fs = LocalFileSystem()
+
+    with fs.open_mmap(path) as buf:
+        assert buf[:] == b"abc"
+        with pytest.raises(TypeError):
+            buf[0] = 1
+    assert bytes(DRPath(str(path)).open_mmap()) == b"abc"
+    assert bytes(fs.open_mmap(Path(tmpdir) / "empty")) == b""
+
+
+def test_iwalk(tmpdir):
+    fs = LocalFileSystem()
+    fs.touch(tmpdir / "test.txt")
+    fs.touch(tmpdir / "dir1" / "deep_test.txt")
+    fs.touch(tmpdir / "dir1" / "dir2" / "deeper_test.txt")
+
+    res = fs.iwalk(tmpdir)
+    assert not isinstance(res, list)
+    res = list(res)
+    assert all(isinstance(item, LocalPath) for item in res)
+    assert sorted(p.name for p in res) == sorted(p.name for p in fs.walk(tmpdir))
+
+    assert [p.name for p in fs.iwalk(tmpdir, maxdepth=1)] == ["test.txt"]
+    assert len(list(fs.iwalk(tmpdir, maxdepth=2))) == 2
+    assert len(list(fs.iwalk(tmpdir, limit=2))) == 2
+    assert list(fs.iwalk(tmpdir / "missing")) == []
+
+
+def test_iglob(tmpdir):
+    fs = LocalFileSystem()
+    for i in range(5):
+        fs.touch(tmpdir / f"test{i}.txt")
+    fs.touch(tmpdir / "dir1" / "deep_test.txt")
+
+    tmpdir = Path(tmpdir)
+    assert len(list(fs.iglob(tmpdir / "*.txt"))) == 5
+    assert len(list(fs.iglob(tmpdir / "*.txt", limit=3))) == 3
+    assert len(list(fs.iglob(tmpdir / "**" / "*.txt", recursive=True))) == 6
+    assert all(isinstance(item, LocalPath) for item in fs.iglob(tmpdir / "*"))
+
+
+def test_batch_methods(tmpdir):
+    fs = LocalFileSystem()
+    paths = [tmpdir / f"{i}.txt" for i in range(3)]
+    for i, path in enumerate(paths):
+        with fs.open(path, "wb") as f:
+            f.write(str(i).encode())
+
+    assert fs.exists_many(paths + [tmpdir / "missing"]) == [True] * 3 + [False]
+    assert fs.cat_many(paths, max_workers=2) == [b"0", b"1", b"2"]
+    fs.copy_many([(p, str(p) + ".bak") for p in paths])
+    assert fs.cat_many([str(p) + ".bak" for p in paths]) == [b"0", b"1", b"2"]
+    assert fs.remove_many(paths) == [None] * 3
+    assert fs.exists_many(paths) == [False] * 3
+
+    with pytest.raises(BatchError) as exc_info:
+        fs.info_many([str(paths[0]) + ".bak", paths[0]])
+    assert exc_info.value.results[0] is not None
+    assert list(exc_info.value.errors) == [str(paths[0])]
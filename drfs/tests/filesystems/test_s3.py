@@ -1,6 +1,11 @@
+import os
+
 import pytest
 
-from drfs.path import RemotePath
+from drfs import config
+
+from drfs.filesystems import BatchError
+from drfs.path import DRPath, RemotePath
 
 try:
     from drfs.tests.test_filesystem import S3FileSystem
@@ -50,3 +55,270 @@ def test_remove_recursive(s3):
     assert not fs.exists("s3://test-bucket/dir1")
     assert not fs.exists("s3://test-bucket/dir1/deep_test.txt")
     assert not fs.exists("s3://test-bucket/dir1/subdir/deeper_test.txt")
+
+
+def test_remove_many(s3, monkeypatch):
+    fs = S3FileSystem()
+    paths = [f"s3://test-bucket/many/{i}.txt" for i in range(5)]
+    for path in paths:
+        fs.touch(path)
+
+    assert fs.remove_many(paths[:3]) == [None] * 3
+
+    assert fs.exists_many(paths) == [False] * 3 + [True] * 2
+
+    def no_listing(*args, **kwargs):
+        raise AssertionError("keys are looked up without listing their prefix")
+
+    missing = "s3://test-bucket/many/missing.txt"
+    with monkeypatch.context() as m:
+        m.setattr(fs.fs, "ls", no_listing)
+        with pytest.raises(BatchError) as exc_info:
+            fs.remove_many([paths[3], missing])
+    assert list(exc_info.value.errors) == [missing]
+    assert isinstance(exc_info.value.errors[missing], FileNotFoundError)
+    assert exc_info.value.results == [None, None]
+    assert not fs.exists(paths[3])
+
+    def denied(Bucket, Delete):
+        keys = [obj["Key"] for obj in Delete["Objects"]]
+        return {"Errors": [{"Key": k, "Code": "AccessDenied"} for k in keys]}
+
+    monkeypatch.setattr(fs.fs.s3, "delete_objects", denied)
+    with pytest.raises(BatchError) as exc_info:
+        fs.remove_many([paths[4]])
+    assert isinstance(exc_info.value.errors[paths[4]], PermissionError)
+    monkeypatch.undo()
+    fs.remove(paths[4])
+
+
+def test_batch_errors(s3):
+    fs = S3FileSystem()
+
+    with pytest.raises(BatchError) as exc_info:
+        fs.cat_many(["s3://test-bucket/test.txt", "s3://test-bucket/missing.txt"])
+
+    assert exc_info.value.results == [b"bla", None]
+    assert list(exc_info.value.errors) == ["s3://test-bucket/missing.txt"]
+    assert len(fs.info_many(["s3://test-bucket/test.txt"] * 2)) == 2
+
+
+def test_listings_cache(s3):
+    fs = S3FileSystem(listings_ttl=60)
+    fs.touch("s3://test-bucket/cached/a.txt")
+
+    assert len(fs.ls("s3://test-bucket/cached")) == 1
+    assert len(fs.ls("s3://test-bucket/cached/")) == 1
+    assert fs.listings.stats()["hits"] == 1
+
+    fs.touch("s3://test-bucket/cached/b.txt")
+    assert len(fs.ls("s3://test-bucket/cached")) == 2
+    with fs.open("s3://test-bucket/cached/c.txt", "wb") as f:
+        f.write(b"c")
+    assert len(fs.glob("s3://test-bucket/cached/*.txt")) == 3
+    with fs.open("s3://test-bucket/cached/d.txt", "wb") as f:
+        f.write(b"d")
+        # listed while the object doesn't exist yet
+        assert len(fs.ls("s3://test-bucket/cached")) == 3
+    assert len(fs.ls("s3://test-bucket/cached")) == 4
+
+    fs.rm("s3://test-bucket/cached", recursive=True)
+    assert fs.ls("s3://test-bucket/cached") == []
+    assert fs.listings.stats()["hits"] == 1
+    assert S3FileSystem().listings is None
+
+
+def test_info_cache(s3):
+    fs = S3FileSystem(info_ttl=60)
+    fs.touch("s3://test-bucket/infos/a.txt")
+    fs.touch("s3://test-bucket/infos/sub/b.txt")
+
+    listing = fs.ls("s3://test-bucket/infos", detail=True)
+    assert {i["name"] for i in listing} == {
+        "s3://test-bucket/infos/a.txt",
+        "s3://test-bucket/infos/sub",
+    }
+    assert fs.infos.stats()["size"] == 2
+    assert fs.info("s3://test-bucket/infos/a.txt")["size"] == 0
+    assert fs.exists("s3://test-bucket/infos/a.txt")
+    assert fs.infos.stats()["hits"] == 2
+
+    found = fs.walk("s3://test-bucket/infos", detail=True)
+    assert [i["name"] for i in found][-1] == "s3://test-bucket/infos/sub/b.txt"
+    assert fs.info("s3://test-bucket/infos/sub/b.txt")
+    assert fs.infos.stats()["hits"] == 3
+
+    fs.rm("s3://test-bucket/infos", recursive=True)
+    assert not fs.exists("s3://test-bucket/infos/a.txt")
+    assert S3FileSystem().infos is None
+
+
+def test_info_cache_overwrite(s3, tmpdir, monkeypatch):
+    fs = S3FileSystem(
+        info_ttl=60, disk_cache={"directory": str(tmpdir), "block_size": 0}
+    )
+    with fs.open("s3://test-bucket/infos/a.bin", "wb") as f:
+        f.write(b"a")
+    assert fs.open("s3://test-bucket/infos/a.bin", "rb").read() == b"a"
+    with fs.open("s3://test-bucket/infos/a.bin", "wb") as f:
+        f.write(b"abcd")
+        assert fs.info("s3://test-bucket/infos/a.bin")["size"] == 1
+    assert fs.info("s3://test-bucket/infos/a.bin")["size"] == 4
+    with fs.open("s3://test-bucket/infos/a.bin", "rb") as f:
+        assert f.read() == b"abcd"
+
+    put_file = fs._put_file
+
+    def put_and_read(filename, path, *args, **kwargs):
+        # a concurrent reader fetches the info while the upload runs
+        assert fs.info(path)["size"] == 4
+        return put_file(filename, path, *args, **kwargs)
+
+    monkeypatch.setattr(fs, "_put_file", put_and_read)
+    with fs.open("s3://test-bucket/infos/a.bin", "wb", atomic=True) as f:
+        f.write(b"abcdef")
+    assert fs.info("s3://test-bucket/infos/a.bin")["size"] == 6
+
+
+def test_open_mmap(s3, tmpdir, monkeypatch):
+    fs = S3FileSystem()
+    with fs.open("s3://test-bucket/mmap.bin", "wb") as f:
+        f.write(b"abc")
+    path = DRPath("s3://test-bucket/mmap.bin")
+
+    assert path.open_mmap(cache_dir=str(tmpdir))[:] == b"abc"
+    monkeypatch.setattr(S3FileSystem, "open", None)
+    # served from the local copy
+    assert fs.open_mmap(path, cache_dir=str(tmpdir))[:] == b"abc"
+    assert len(tmpdir.listdir()) == 1
+    monkeypatch.undo()
+
+    with fs.open("s3://test-bucket/mmap.bin", "wb") as f:
+        f.write(b"abcd")
+    assert fs.open_mmap(path, cache_dir=str(tmpdir))[:] == b"abcd"
+    assert len(tmpdir.listdir()) == 1
+    fs.rm("s3://test-bucket/mmap.bin")
+
+
+@pytest.mark.parametrize("block_size", [None, 2])
+def test_disk_cache(s3, tmpdir, monkeypatch, block_size):
+    fs = S3FileSystem(disk_cache={"directory": str(tmpdir), "block_size": block_size})
+    with fs.open("s3://test-bucket/cached.txt", "wb") as f:
+        f.write(b"abcde")
+
+    with fs.open("s3://test-bucket/cached.txt", "rb") as f:
+        assert f.read() == b"abcde"
+    monkeypatch.setattr(fs.fs, "open", None)
+    with fs.open("s3://test-bucket/cached.txt", "rb") as f:
+        f.seek(1)
+        assert f.read(3) == b"bcd"
+    with fs.open("s3://test-bucket/cached.txt", "r") as f:
+        assert f.read() == "abcde"
+    monkeypatch.undo()
+
+    assert fs.disk_cache.stats()["hits"] > 0
+    with fs.open("s3://test-bucket/cached.txt", "wb") as f:
+        f.write(b"xyz")
+    with fs.open("s3://test-bucket/cached.txt", "rb") as f:
+        assert f.read() == b"xyz"
+    fs.rm("s3://test-bucket/cached.txt")
+
+
+def test_io_profiles(s3):
+    fs = S3FileSystem(io_profile="sequential")
+    with fs.open("s3://test-bucket/data.parquet", "wb") as f:
+        f.write(b"data")
+
+    with fs.open("s3://test-bucket/data.parquet", "rb") as f:
+        assert f.blocksize == 16777216
+        assert type(f.cache).__name__ == "ReadAheadCache"
+    with fs.open("s3://test-bucket/data.parquet", io_profile="random") as f:
+        assert type(f.cache).__name__ == "BlockCache"
+    with fs.open("s3://test-bucket/data.parquet", block_size=10) as f:
+        assert f.blocksize == 10
+
+    config["io_profile_rules"] = [
+        {"pattern": "s3://*.parquet", "profile": "parquet_footer"}
+    ]
+    try:
+        with fs.open("s3://test-bucket/data.parquet", "rb") as f:
+            assert type(f.cache).__name__ == "BlockCache"
+            assert f.tell() == 0
+            assert f.read() == b"data"
+    finally:
+        config["io_profile_rules"] = []
+    with pytest.raises(ValueError):
+        fs.open("s3://test-bucket/data.parquet", io_profile="unknown")
+    fs.rm("s3://test-bucket/data.parquet")
+
+
+def test_put_get_multipart(s3, tmpdir, monkeypatch):
+    mib = 1024 * 1024
+    data = os.urandom(11 * mib)
+    src = tmpdir.join("src.bin")
+    src.write_binary(data)
+    fs = S3FileSystem()
+
+    calls = []
+    upload_part = fs.fs.s3.upload_part
+
+    def flaky_upload_part(**kwargs):
+        calls.append(kwargs["PartNumber"])
+        if calls.count(2) == 1 and kwargs["PartNumber"] == 2:
+            raise ConnectionError("reset")
+        return upload_part(**kwargs)
+
+    monkeypatch.setattr(fs.fs.s3, "upload_part", flaky_upload_part)
+    monkeypatch.setattr("drfs.filesystems.util.time.sleep", lambda s: None)
+    fs.put(src, "s3://test-bucket/big.bin", part_size=5 * mib, max_workers=3)
+    assert sorted(calls) == [1, 2, 2, 3]
+
+    fs.get("s3://test-bucket/big.bin", tmpdir.join("a.bin"), part_size=3 * mib)
+    assert tmpdir.join("a.bin").read_binary() == data
+    assert sorted(os.listdir(tmpdir)) == ["a.bin", "src.bin"]
+    fs.rm("s3://test-bucket/big.bin")
+
+
+def test_put_get_recursive(s3, tmpdir):
+    src = tmpdir.mkdir("src")
+    src.join("a.txt").write("a")
+    src.mkdir("sub").join("b.txt").write("b")
+    fs = S3FileSystem()
+
+    with pytest.raises(IsADirectoryError):
+        fs.put(src, "s3://test-bucket/tree")
+    fs.put(src, "s3://test-bucket/tree", recursive=True, max_workers=2)
+    assert sorted(fs.fs.find("test-bucket/tree")) == [
+        "test-bucket/tree/a.txt",
+        "test-bucket/tree/sub/b.txt",
+    ]
+
+    fs.get("s3://test-bucket/tree", tmpdir.join("dst"), recursive=True)
+    assert tmpdir.join("dst", "sub", "b.txt").read() == "b"
+    with pytest.raises(BatchError) as exc_info:
+        fs.get("s3://test-bucket/tree", "/dev/null/dst", recursive=True)
+    assert len(exc_info.value.errors) == 2
+    fs.rm("s3://test-bucket/tree", recursive=True)
+
+
+def test_server_side_copy(s3, monkeypatch):
+    mib = 1024 * 1024
+    data = os.urandom(11 * mib)
+    s3.pipe("test-bucket/big.bin", data)
+    fs = S3FileSystem()
+    monkeypatch.setattr(fs, "open", None)  # no data through this process
+
+    fs.copy("s3://test-bucket/test.txt", "s3://test-bucket/copy.txt")
+    assert s3.cat("test-bucket/copy.txt") == b"bla"
+    # objects bigger than MAX_COPY_SIZE are copied in parts
+    monkeypatch.setattr("drfs.filesystems.s3.MAX_COPY_SIZE", 10 * mib)
+    fs.copy("s3://test-bucket/big.bin", "s3://test-bucket/big2.bin")
+    assert s3.cat("test-bucket/big2.bin") == data
+
+    for i in range(3):
+        s3.pipe(f"test-bucket/part=1/{i}.txt", b"x")
+    fs.move("s3://test-bucket/part=1", "s3://test-bucket/part=2", recursive=True)
+    assert sorted(s3.find("test-bucket/part=2")) == [
+        f"test-bucket/part=2/{i}.txt" for i in range(3)
+    ]
+    assert not s3.find("test-bucket/part=1")
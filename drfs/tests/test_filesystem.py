@@ -5,18 +5,22 @@ the functionality itself is not tested but it should be tested
 in the corresponding modules that create the (base) classes of
 the filesystems.
 """
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from warnings import warn
 
 import pytest
 
-from drfs.filesystems import get_fs
+from drfs import config
+from drfs.filesystems import BatchError, clear_fs_cache, get_fs
 from drfs.filesystems.base import FILESYSTEMS
 from drfs.filesystems.local import LocalFileSystem
 from drfs.filesystems.memory import MemoryFileSystem
-from drfs.filesystems.util import return_pathlib
-from drfs.path import RemotePath, aspath
-from drfs.util import prepend_scheme
+from drfs.filesystems.util import get_fs_instance, return_pathlib
+from drfs.path import LocalPath, RemotePath, aspath
+from drfs.util import prepend_scheme, prepend_schemes
 
 try:
     from drfs.filesystems.s3 import S3FileSystem
@@ -99,6 +103,53 @@ def test_get_fs(path, fs):
     assert isinstance(get_fs(path), fs)
 
 
+def test_get_fs_cache():
+    fs = get_fs("memory://some/file.txt")
+
+    assert get_fs("memory://other/file.txt") is fs
+    assert get_fs("memory://some/file.txt", use_cache=False) is not fs
+    assert get_fs("memory://some/file.txt", opts={"a": [1]}) is not fs
+    assert get_fs("memory://a", opts={"a": [1]}) is get_fs("memory://b", {"a": [1]})
+    assert get_fs("/some/file.txt") is not fs
+
+    clear_fs_cache("/some/file.txt")
+    assert get_fs("memory://other/file.txt") is fs
+    clear_fs_cache()
+    assert get_fs("memory://other/file.txt") is not fs
+
+
+def test_get_fs_cache_eviction():
+    config["fs_cache_size"] = 1
+    try:
+        fs = get_fs("memory://some/file.txt")
+        get_fs("/some/file.txt")
+        assert get_fs("memory://some/file.txt") is not fs
+    finally:
+        config["fs_cache_size"] = 128
+
+
+def test_get_fs_instance_created_outside_lock(monkeypatch):
+    started, release = threading.Event(), threading.Event()
+
+    class SlowFileSystem(MemoryFileSystem):
+        def __init__(self, **kwargs):
+            started.set()
+            release.wait(5)
+            super().__init__(**kwargs)
+
+    monkeypatch.setitem(FILESYSTEMS, "slow", SlowFileSystem)
+    with ThreadPoolExecutor(3) as pool:
+        slow = [pool.submit(get_fs_instance, "slow", {}) for _ in range(2)]
+        started.wait(5)
+        # other callers don't wait for the slow filesystem
+        fast = pool.submit(get_fs, "memory://some/file.txt")
+        try:
+            assert isinstance(fast.result(timeout=1), MemoryFileSystem)
+        finally:
+            release.set()
+        assert slow[0].result() is slow[1].result()
+
+
 def relative_path_factory(root):
     def f(arg):
         arg = str(arg)
@@ -162,6 +213,55 @@ def test_return_pathlib():
     assert all([isinstance(item, Path) for item in foo.f(["hey", "ho"])])
 
 
+def test_aspath_resolves_class_once(monkeypatch):
+    import drfs.path
+
+    calls = []
+
+    def get_fs(path, *args, **kwargs):
+        calls.append(path)
+        return orig_get_fs(path, *args, **kwargs)
+
+    orig_get_fs = drfs.path.get_fs
+    monkeypatch.setattr(drfs.path, "get_fs", get_fs)
+    monkeypatch.setattr(drfs.path, "_PATH_CLASSES", {})
+
+    res = aspath([f"s3://bucket/{i}" for i in range(10)] + ["/a", "/b"])
+
+    assert len(calls) == 2
+    assert all(isinstance(p, RemotePath) for p in res[:10])
+    assert all(isinstance(p, LocalPath) for p in res[10:])
+
+
+def test_return_pathlib_as_strings():
+    fs = MemoryFileSystem()
+    fs.touch("memory://as_strings/file.txt")
+
+    assert fs.ls("memory://as_strings", as_paths=False) == [
+        "memory://as_strings/file.txt"
+    ]
+
+
+def test_as_paths_option(tmpdir):
+    fs = LocalFileSystem(as_paths=False)
+    fs.touch(tmpdir / "file.txt")
+
+    assert fs.ls(tmpdir) == [str(tmpdir / "file.txt")]
+    assert fs.walk(tmpdir) == [str(tmpdir / "file.txt")]
+    assert list(fs.iwalk(tmpdir)) == [str(tmpdir / "file.txt")]
+    assert fs.ls(tmpdir, as_paths=True) == [LocalPath(tmpdir / "file.txt")]
+
+
+def test_as_paths_config(tmpdir):
+    config["as_paths"] = False
+    try:
+        fs = get_fs(str(tmpdir))
+        fs.touch(tmpdir / "file.txt")
+        assert fs.ls(tmpdir) == [str(tmpdir / "file.txt")]
+    finally:
+        config["as_paths"] = True
+
+
 def test_memory_fs_rw():
     fs = MemoryFileSystem()
 
@@ -229,3 +329,126 @@ def test_glob_files(s3_data_dir):
 )
 def test_prepend_scheme(scheme, path, exp):
     assert prepend_scheme(scheme, path) == exp
+    assert prepend_schemes(scheme, [path]) == [exp]
+
+
+def test_memory_fs_prefix_index():
+    fs = MemoryFileSystem()
+    for name in ["a/x.txt", "a/b/y.txt", "a/b/c/z.txt", "a.txt", "ab/w.txt"]:
+        fs.touch(f"memory://index_test/{name}")
+
+    assert fs.exists("memory://index_test")
+    assert fs.exists("memory://index_test/a")
+    assert fs.exists("memory://index_test/a/b/")
+    assert fs.exists("memory://index_test/a/b/c/z.txt")
+    assert not fs.exists("memory://index_test/a/b/c/z")
+    assert not fs.exists("memory://index_te")
+
+    assert sorted(map(str, fs.ls("memory://index_test/a"))) == [
+        "memory://index_test/a/b/",
+        "memory://index_test/a/x.txt",
+    ]
+    assert len(fs.ls("memory://index_test")) == 3
+
+    fs.rm("memory://index_test/a", recursive=True)
+    assert not fs.exists("memory://index_test/a")
+    assert not fs.exists("memory://index_test/a/b/c/z.txt")
+    assert fs.exists("memory://index_test/a.txt")
+    assert fs.exists("memory://index_test/ab/w.txt")
+
+
+def test_memory_fs_rm_many():
+    fs = MemoryFileSystem()
+    for name in ["a/x.txt", "a/b/y.txt", "b/z.txt", "c.txt", "d.txt"]:
+        fs.touch(f"memory://rm_many/{name}")
+
+    with pytest.raises(BatchError) as exc_info:
+        fs.rm(
+            [
+                "memory://rm_many/a",
+                RemotePath("memory://rm_many/b"),
+                "memory://rm_many/c.txt",
+                "memory://rm_many/missing",
+            ],
+            recursive=True,
+        )
+
+    assert list(exc_info.value.errors) == ["memory://rm_many/missing"]
+    assert list(map(str, fs.ls("memory://rm_many"))) == ["memory://rm_many/d.txt"]
+
+
+def test_memory_fs_batch_methods():
+    fs = MemoryFileSystem()
+    paths = [f"memory://batch/{i}.txt" for i in range(3)]
+    for i, path in enumerate(paths):
+        with fs.open(path, "wb") as f:
+            f.write(str(i).encode())
+
+    assert fs.cat_many(paths) == [b"0", b"1", b"2"]
+    with pytest.raises(BatchError) as exc_info:
+        fs.cat_many(paths + ["memory://batch/missing"])
+    assert list(exc_info.value.errors) == ["memory://batch/missing"]
+
+    fs.remove_many(paths[:2])
+    assert fs.exists_many(paths) == [False, False, True]
+    with pytest.raises(BatchError) as exc_info:
+        fs.remove_many([paths[2], "memory://batch/missing"], recursive=True)
+    assert exc_info.value.results == [None, None]
+    with pytest.raises(FileNotFoundError):
+        fs.rm("memory://batch/missing", recursive=True)
+
+
+def test_memory_fs_put_get(tmpdir):
+    fs = MemoryFileSystem()
+    src = tmpdir.mkdir("src")
+    src.join("a.bin").write_binary(bytes(range(256)) * 40)
+    src.mkdir("sub").join("b.txt").write_binary(b"b")
+
+    fs.put(str(src.join("a.bin")), "memory://put_get/a.bin")
+    with pytest.raises(IsADirectoryError):
+        fs.put(str(src), "memory://put_get/tree")
+    fs.put(str(src), "memory://put_get/tree", recursive=True)
+    assert fs.cat("memory://put_get/tree/sub/b.txt") == b"b"
+
+    # bigger than part_size, downloaded as concurrent ranges
+    dst = tmpdir.join("dst.bin")
+    fs.get("memory://put_get/a.bin", str(dst), part_size=1000, max_workers=4)
+    assert dst.read_binary() == src.join("a.bin").read_binary()
+
+    fs.get("memory://put_get/tree", str(tmpdir.join("out")), recursive=True)
+    assert tmpdir.join("out", "sub", "b.txt").read_binary() == b"b"
+    assert tmpdir.join("out", "a.bin").read_binary() == dst.read_binary()
+    assert not [p for p in tmpdir.listdir() if p.basename.endswith(".part")]
+
+
+def test_memory_fs_copy_move_recursive():
+    fs = MemoryFileSystem()
+    for name in ["a.txt", "sub/b.txt"]:
+        fs.touch(f"memory://copy_move/src/{name}")
+
+    fs.copy("memory://copy_move/src", "memory://copy_move/copy", recursive=True)
+    fs.move("memory://copy_move/src", "memory://copy_move/moved", recursive=True)
+    for root in ["copy", "moved"]:
+        assert fs.fs.find(f"/copy_move/{root}") == [
+            f"/copy_move/{root}/a.txt",
+            f"/copy_move/{root}/sub/b.txt",
+        ]
+    assert not fs.exists("memory://copy_move/src/a.txt")
+
+
+def test_memory_fs_open_atomic():
+    fs = MemoryFileSystem()
+    path = "memory://atomic/out.txt"
+
+    with pytest.raises(RuntimeError):
+        with fs.open(path, "w", atomic=True) as f:
+            f.write("partial")
+            raise RuntimeError
+    assert not fs.exists(path)
+    with fs.open(path, "w", atomic=True) as f:
+        f.write("a")
+        assert not fs.exists(path)
+    assert fs.cat(path) == b"a"
+    with pytest.raises(ValueError):
+        fs.open(path, "r+b", atomic=True)
+    assert fs.open(path, "rb", atomic=True).read() == b"a"
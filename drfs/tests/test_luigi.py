@@ -0,0 +1,40 @@
+import pytest
+
+pytest.importorskip("luigi")
+
+from drfs.luigi import FileTarget  # noqa: E402
+
+
+def test_file_target_atomic_by_default(tmpdir):
+    target = FileTarget(str(tmpdir.join("out.txt")))
+
+    with pytest.raises(RuntimeError):
+        with target.open("w") as f:
+            f.write("partial")
+            raise RuntimeError
+    assert not target.exists()
+    with target.open("w") as f:
+        f.write("a")
+        assert not target.exists()
+    assert target.open().read() == "a"
+    with target.open("a") as f:
+        f.write("b")
+    assert target.open().read() == "ab"
+
+
+def test_file_target_not_atomic(tmpdir):
+    target = FileTarget(str(tmpdir.join("out.txt")))
+
+    with target.open("w", atomic=False) as f:
+        f.write("a")
+        f.flush()
+        assert target.exists()
+    assert target.open().read() == "a"
+
+
+def test_file_target_default_mode():
+    target = FileTarget("memory://luigi/out.bin")
+    with target.open("wb") as f:
+        f.write(b"a")
+
+    assert target.open().read() == b"a"
@@ -1,7 +1,7 @@
 import pytest
 
 from drfs import config
-from drfs.path import DRPath
+from drfs.path import DRPath, LocalPath, RemotePath
 
 
 def test_is_wildcard():
@@ -61,3 +61,33 @@ def test_path_startswith(str_path):
     p = DRPath(str_path)
 
     assert p.startswith(str_path[:5])
+
+
+def test_remote_accessor_shared():
+    opts = {"some": "option"}
+    p1 = DRPath("memory://bucket/dir/file.txt", storage_options=opts)
+    p2 = DRPath("memory://bucket/other.txt", storage_options=dict(opts))
+
+    assert p1._accessor is p2._accessor
+    assert p1.parent._accessor is p1._accessor
+    assert p1.with_name("x.txt")._accessor is p1._accessor
+    assert p1.with_name("{x}.txt").format(x=1).storage_options == opts
+    assert DRPath("memory://bucket/x.txt")._accessor is not p1._accessor
+
+
+@pytest.mark.parametrize(
+    "path, cls",
+    [
+        ("/home/test_dir", LocalPath),
+        ("relative/dir", LocalPath),
+        ("file://home/test_dir", LocalPath),
+        (r"C:\Users\drfs", LocalPath),
+        ("/tmp/odd://name", LocalPath),
+        ("s3://bucket/key", RemotePath),
+        ("memory://dir/file", RemotePath),
+        (RemotePath("s3://bucket/key"), RemotePath),
+    ],
+)
+def test_path_class_dispatch(path, cls):
+    assert type(DRPath(path)) is cls
+    assert type(DRPath(path)) is cls  # second time from memo
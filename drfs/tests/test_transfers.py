@@ -0,0 +1,73 @@
+import pytest
+
+import drfs
+from drfs import transfers
+from drfs.filesystems import BatchError, get_fs
+
+
+def test_transfer_recursive(tmpdir):
+    src = tmpdir.mkdir("src")
+    src.join("a.bin").write_binary(bytes(range(256)) * 40)
+    src.mkdir("sub").join("b.txt").write_binary(b"b")
+    reports = []
+
+    report = drfs.transfer(
+        str(src),
+        "memory://transfer/dst",
+        recursive=True,
+        chunk_size=1000,
+        queue_size=2,
+        callback=reports.append,
+    )
+    fs = get_fs("memory://transfer")
+    assert fs.cat("memory://transfer/dst/a.bin") == bytes(range(256)) * 40
+    assert fs.cat("memory://transfer/dst/sub/b.txt") == b"b"
+    assert (report.files, report.skipped, report.bytes) == (2, 0, 10241)
+    assert report.throughput > 0
+    assert len(reports) == 2
+
+    # up to date files are skipped, changed ones copied
+    src.join("sub", "b.txt").write_binary(b"bb")
+    report = drfs.transfer(str(src), "memory://transfer/dst", recursive=True)
+    assert (report.files, report.skipped, report.bytes) == (1, 1, 2)
+    assert fs.cat("memory://transfer/dst/sub/b.txt") == b"bb"
+
+    report = drfs.transfer(
+        "memory://transfer/dst", str(tmpdir.join("back")), recursive=True
+    )
+    assert report.files == 2
+    assert tmpdir.join("back", "sub", "b.txt").read_binary() == b"bb"
+
+
+def test_transfer_file(tmpdir):
+    with get_fs("memory://bucket").open("memory://bucket/data.bin", "wb") as f:
+        f.write(b"x" * 2500)
+
+    target = str(tmpdir.join("data.bin"))
+
+    report = drfs.transfer(
+        "memory://bucket/data.bin", str(tmpdir) + "/", chunk_size=1000
+    )
+    assert tmpdir.join("data.bin").read_binary() == b"x" * 2500
+    assert report.bytes == 2500
+
+    assert drfs.transfer("memory://bucket/data.bin", target).skipped
+    assert drfs.transfer("memory://bucket/data.bin", target, overwrite=True).files
+    with pytest.raises(FileNotFoundError):
+        drfs.transfer("memory://bucket/missing", str(tmpdir.join("missing")))
+
+
+def test_transfer_failed_read(tmpdir, monkeypatch):
+    src = tmpdir.join("a.bin")
+    src.write_binary(b"a" * 5000)
+    read = transfers._Pipe._read
+
+    def fail_third_chunk(self, path, start, end):
+        if start == 2000:
+            raise IOError("read failed")
+        return read(self, path, start, end)
+
+    monkeypatch.setattr(transfers._Pipe, "_read", fail_third_chunk)
+    with pytest.raises(BatchError):
+        drfs.transfer(str(src), "memory://tp/a.bin", chunk_size=1000, queue_size=1)
+    assert not get_fs("memory://tp").exists("memory://tp/a.bin")
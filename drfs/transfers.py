@@ -0,0 +1,286 @@
+"""Copy files between any two filesystems, e.g. from S3 to GCS.
+
+Reads and writes are pipelined: chunks of a file are read concurrently while
+earlier chunks are written, with a bounded number of chunks in flight per file.
+Many files are transferred at the same time.
+"""
+
+import datetime
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from drfs import config
+from drfs.filesystems import get_fs
+from drfs.filesystems.util import is_transient, retry, transfer_options
+from drfs.path import asstr
+from drfs.util import prepend_scheme
+
+
+def transfer(
+    src,
+    dst,
+    recursive=False,
+    overwrite=False,
+    max_workers=None,
+    chunk_size=None,
+    queue_size=None,
+    retries=None,
+    src_opts=None,
+    dst_opts=None,
+    callback=None,
+):
+    """Copy src to dst, which may be on different filesystems.
+
+    Parameters
+    ----------
+    src: str or DRPath
+        a file, or with `recursive=True` a directory or prefix.
+    dst: str or DRPath
+        target file or directory. If src is a file and dst ends with "/", the
+        file is copied into it.
+    recursive: bool
+        copy all files below src to the same relative paths below dst.
+    overwrite: bool
+        copy files even if they are up to date: if the target has the same
+        size and the same ETag or a modification time not older than the
+        source, it is skipped by default.
+    max_workers: int
+        number of files copied at the same time and number of threads reading
+        chunks, defaults to the `transfer` config key.
+    chunk_size: int
+        size of reads, defaults to the `transfer.chunk_size` config key.
+    queue_size: int
+        chunks read ahead per file, at most max_workers * queue_size chunks are
+        in memory. Defaults to the `transfer.queue_size` config key.
+    retries: int
+        times a failed read is retried.
+    src_opts, dst_opts: dict
+        options for `get_fs` of the source and target filesystem.
+    callback: callable
+        called with the TransferReport after each file.
+
+    Returns
+    -------
+    report: TransferReport
+
+    Raises
+    ------
+    BatchError
+        after all files have been processed, if any of them failed.
+    """
+    src, dst = asstr(src), asstr(dst)
+    opts = transfer_options(max_workers, None, retries)
+    if chunk_size is None:
+        chunk_size = config["transfer"]["chunk_size"].get(int)
+    if queue_size is None:
+        queue_size = config["transfer"]["queue_size"].get(int)
+    src_fs = get_fs(src, opts=src_opts)
+    dst_fs = get_fs(dst, opts=dst_opts)
+    if recursive:
+        files = _list_tree(src_fs, src)
+        existing = dict(_list_tree(dst_fs, dst)) if not overwrite else {}
+        jobs = [
+            (info, _join(dst_fs, dst, rel), existing.get(rel)) for rel, info in files
+        ]
+    else:
+        if dst.endswith("/"):
+            dst += src.rstrip("/").rsplit("/", 1)[-1]
+        jobs = [(_info(src_fs, src), dst, None if overwrite else _info(dst_fs, dst))]
+        if jobs[0][0] is None:
+            raise FileNotFoundError(src)
+
+    report = TransferReport()
+    with ThreadPoolExecutor(opts.max_workers) as readers:
+        pipe = _Pipe(src_fs, dst_fs, readers, chunk_size, queue_size, opts.retries)
+
+        def run(job):
+            info, target, target_info = job
+            if _up_to_date(src_fs, dst_fs, info, target_info):
+                report._add(0, skipped=True)
+            else:
+                report._add(pipe.copy(info, target))
+            if callback is not None:
+                callback(report)
+
+        try:
+            src_fs._map_many(
+                run, jobs, opts.max_workers, keys=[info["name"] for info, *_ in jobs]
+            )
+        finally:
+            report._finish()
+            dst_fs.invalidate_caches(dst)
+    return report
+
+
+class TransferReport:
+    """Counts of a transfer, updated while it runs.
+
+    Attributes
+    ----------
+    files: int
+        files copied.
+    skipped: int
+        files skipped because they were up to date.
+    bytes: int
+        bytes copied.
+    seconds: float
+        time since the start, or duration once finished.
+    """
+
+    def __init__(self):
+        self.files = 0
+        self.skipped = 0
+        self.bytes = 0
+        self._start = time.monotonic()
+        self._end = None
+        self._lock = threading.Lock()
+
+    @property
+    def seconds(self):
+        return (self._end or time.monotonic()) - self._start
+
+    @property
+    def throughput(self):
+        """Bytes per second."""
+        return self.bytes / self.seconds if self.seconds else 0.0
+
+    def _add(self, nbytes, skipped=False):
+        with self._lock:
+            if skipped:
+                self.skipped += 1
+            else:
+                self.files += 1
+                self.bytes += nbytes
+
+    def _finish(self):
+        self._end = time.monotonic()
+
+    def __repr__(self):
+        return (
+            f"<TransferReport: {self.files} files ({self.bytes / 1e6:.1f} MB) "
+            f"copied, {self.skipped} skipped in {self.seconds:.1f} s, "
+            f"{self.throughput / 1e6:.1f} MB/s>"
+        )
+
+
+class _Pipe:
+    """Copies files chunk by chunk, reading ahead on a shared pool."""
+
+    def __init__(self, src_fs, dst_fs, pool, chunk_size, queue_size, retries):
+        self.src_fs = src_fs
+        self.dst_fs = dst_fs
+        self.pool = pool
+        self.chunk_size = chunk_size
+        self.queue_size = max(queue_size, 1)
+        self.retries = retries
+
+    def copy(self, info, target):
+        """Copy a file, return the number of bytes written.
+
+        The target is written atomically, a failed copy leaves nothing behind.
+        """
+        size = info.get("size")
+        with self.dst_fs.open(target, "wb", atomic=True) as f:
+            if size is None:
+                return self._stream(info["name"], f)
+            queue = deque()
+            try:
+                for offset in range(0, size, self.chunk_size):
+                    end = min(offset + self.chunk_size, size)
+                    queue.append(
+                        self.pool.submit(self._read, info["name"], offset, end)
+                    )
+                    if len(queue) >= self.queue_size:
+                        f.write(queue.popleft().result())
+                while queue:
+                    f.write(queue.popleft().result())
+            finally:
+                for future in queue:
+                    future.cancel()
+        return size
+
+    def _stream(self, path, f):
+        n = 0
+        with self.src_fs.open(path, "rb") as src:
+            for chunk in iter(lambda: src.read(self.chunk_size), b""):
+                n += f.write(chunk)
+        return n
+
+    def _read(self, path, start, end):
+        cat_file = getattr(self.src_fs.fs, "cat_file", None)
+        if cat_file is not None:
+
+            def read():
+                return cat_file(self.src_fs._fs_path(path), start, end)
+
+        else:
+
+            def read():
+                with self.src_fs.open(path, "rb") as f:
+                    f.seek(start)
+                    return f.read(end - start)
+
+        data = retry(read, self.retries, is_transient)
+        if len(data) != end - start:
+            raise IOError(f"{path} changed during transfer")
+        return data
+
+
+def _info(fs, path):
+    try:
+        return fs.info(path)
+    except FileNotFoundError:
+        return None
+
+
+def _list_tree(fs, path):
+    """Return (relative path, info) of all files below path."""
+    root = prepend_scheme(fs.scheme, path.rstrip("/"))
+    try:
+        infos = fs.walk(path, detail=True, as_paths=False)
+    except FileNotFoundError:
+        return []
+    return [
+        (prepend_scheme(fs.scheme, info["name"])[len(root) + 1 :], info)
+        for info in infos
+        if info.get("type") != "directory"
+    ]
+
+
+def _join(fs, root, rel):
+    if fs.is_remote:
+        return root.rstrip("/") + "/" + rel
+    return os.path.join(root, *rel.split("/"))
+
+
+def _up_to_date(src_fs, dst_fs, info, target_info):
+    """True if target_info describes a copy of the file described by info."""
+    if target_info is None or info.get("size") != target_info.get("size"):
+        return False
+    etag = info.get("ETag") or info.get("etag")
+    if etag and type(src_fs) is type(dst_fs):
+        if etag == (target_info.get("ETag") or target_info.get("etag")):
+            return True
+    src_mtime, dst_mtime = _mtime(info), _mtime(target_info)
+    return src_mtime is not None and dst_mtime is not None and dst_mtime >= src_mtime
+
+
+def _mtime(info):
+    """Modification time of info as a timestamp, None if unknown."""
+    for key in ("mtime", "LastModified", "last_modified", "updated", "created"):
+        value = info.get(key)
+        if isinstance(value, str):
+            try:
+                value = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+            except ValueError:
+                continue
+        if isinstance(value, datetime.datetime):
+            if value.tzinfo is None:
+                value = value.replace(tzinfo=datetime.timezone.utc)
+            return value.timestamp()
+        if isinstance(value, (int, float)):
+            return float(value)
+    return None
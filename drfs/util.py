@@ -23,6 +23,34 @@ def prepend_scheme(scheme, path):
         return f"{scheme}://{path}"
 
 
+def prepend_schemes(scheme, paths):
+    """Prepend scheme to many paths, see `prepend_scheme`.
+
+    Parameters
+    ----------
+    scheme: str
+        a scheme like 'file', 's3' or 'gs'
+    paths: iterable of str
+        paths which will possibly get a scheme prepended, info dicts get it
+        prepended to their "name"
+
+    Returns
+    -------
+    full_paths: list of str
+    """
+    prefix = (scheme or "file") + "://"
+
+    def prepend(p):
+        if isinstance(p, dict):
+            # detailed listings return info dicts
+            return dict(p, name=prepend(p["name"]))
+        if p.startswith(prefix):
+            return p
+        return prefix + (p[1:] if p.startswith("/") else p)
+
+    return [prepend(p) for p in paths]
+
+
 def remove_scheme(path, raise_=True):
     """Remove scheme from a path
 